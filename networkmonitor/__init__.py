@@ -1,24 +1,48 @@
 """
 Network Monitor - A network monitoring and control tool
 """
+import atexit
 import logging
+import queue
 import sys
 import platform
 import os
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 __version__ = "0.1.0"
 __author__ = "Network Monitor Team"
 
-# Setup basic logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('networkmonitor.log'),
-        logging.StreamHandler()
-    ]
-)
+# Log level can be raised for debugging without a code change, e.g. NM_LOG_LEVEL=DEBUG
+LOG_LEVEL = os.environ.get('NM_LOG_LEVEL', 'INFO').upper()
+
+def setup_logging():
+    """Configure logging for the application, called by its entry points
+    
+    Records go through a queue to a listener thread that does the file and
+    console writes, so code logging from a scan never blocks on I/O. Does
+    nothing if logging is already configured, so importing the package
+    (e.g. as a library or under pytest) never creates a log file.
+    """
+    if logging.getLogger().handlers:
+        return
+    level = logging.getLevelName(LOG_LEVEL)
+    if not isinstance(level, int):
+        level = logging.INFO
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [logging.FileHandler('networkmonitor.log'), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(listener.stop)
+    # The listener's handlers do the formatting, so pass messages through as-is
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=level, handlers=[queue_handler])
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +25,8 @@ def main():
     """Main entry point for NetworkMonitor application."""
     try:
         # Import after path setup
+        from networkmonitor import setup_logging
+        setup_logging()
         from networkmonitor.launcher import start_server
         from networkmonitor.dependency_check import check_system_requirements
         
@@ -3,6 +3,7 @@ Command-line interface for NetworkMonitor
 """
 import sys
 import click
+from . import setup_logging
 from .launcher import start_server
 from .dependency_check import check_system_requirements
 
@@ -52,6 +53,16 @@ def check():
         click.echo(f"Error: {message}", err=True)
         sys.exit(1)
 
+@cli.command('update-oui')
+def update_oui():
+    """Download the IEEE OUI registry for offline vendor lookups"""
+    from .monitor import download_oui_table
+    if download_oui_table():
+        click.echo("OUI registry updated")
+    else:
+        click.echo("Error: failed to download the OUI registry", err=True)
+        sys.exit(1)
+
 @cli.command()
 def version():
     """Show version information"""
@@ -60,6 +71,7 @@ def version():
 
 def main():
     """Main entry point for the CLI"""
+    setup_logging()
     try:
         cli()
     except Exception as e:
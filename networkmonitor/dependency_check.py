@@ -329,7 +329,7 @@ Please install the missing requirements:
    - sudo apt-get install python3.9
 
 2. Network tools:
-   - sudo apt-get install iptables iproute2
+   - sudo apt-get install iptables iproute2 ipset
 
 3. Python packages:
    - Run: pip install -r requirements.txt
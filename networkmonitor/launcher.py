@@ -13,7 +13,6 @@ import traceback
 import tempfile
 import requests
 import socket
-import tkinter as tk
 from pathlib import Path
 from .dependency_check import check_system_requirements
 
@@ -83,10 +82,11 @@ logger = logging.getLogger(__name__)
 logger.info("="*50)
 logger.info("Network Monitor Starting")
 logger.info("="*50)
-logger.info(f"Python version: {sys.version}")
-logger.info(f"Platform: {platform.platform()}")
-logger.info(f"Working directory: {os.getcwd()}")
-logger.info(f"Log file: {log_file}")
+logger.info("Python version: %s", sys.version)
+if logger.isEnabledFor(logging.INFO):
+    logger.info("Platform: %s", platform.platform())
+logger.info("Working directory: %s", os.getcwd())
+logger.info("Log file: %s", log_file)
 
 def is_admin():
     """Check if the application is running with admin/root privileges"""
@@ -186,6 +186,7 @@ def create_console_window():
     """Create a modern, user-friendly console window to display logs and status"""
     if platform.system() == "Windows":
         try:
+            import tkinter as tk
             from tkinter import scrolledtext, ttk
             import threading
             import webbrowser
@@ -766,40 +767,19 @@ def main():
     """Main entry point for the launcher"""
     logger.info("Starting Network Monitor...")
     
-    # Display info about execution environment
-    logger.info(f"Python version: {sys.version}")
-    logger.info(f"Platform: {platform.platform()}")
-    logger.info(f"Executable: {sys.executable}")
-    logger.info(f"Is frozen executable: {getattr(sys, 'frozen', False)}")
-    logger.info(f"Working directory: {os.getcwd()}")
-    logger.info(f"Log file: {log_file}")
+    # Display info about execution environment (platform.platform() probes
+    # the OS, so skip it entirely when INFO is not being logged)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Python version: %s", sys.version)
+        logger.info("Platform: %s", platform.platform())
+        logger.info("Executable: %s", sys.executable)
+        logger.info("Is frozen executable: %s", getattr(sys, 'frozen', False))
+        logger.info("Working directory: %s", os.getcwd())
+        logger.info("Log file: %s", log_file)
     
-    # Import here to avoid circular imports
     try:
-        from .splash import run_with_splash, SplashScreen
-    except ImportError:
-        try:
-            from networkmonitor.splash import run_with_splash, SplashScreen
-        except ImportError:
-            # If splash screen can't be imported, create a minimal version
-            class SplashScreen:
-                def update_status(self, msg, progress=None):
-                    logger.info(msg)
-                
-                def show(self):
-                    pass
-                
-                def close(self):
-                    pass
-            
-            def run_with_splash(target_function, *args, **kwargs):
-                return target_function(*args, **kwargs)
-    
-    # Create splash screen
-    splash = SplashScreen()
-    
-    try:
-        # Check for admin privileges
+        # Check for admin privileges before importing the GUI modules; when we
+        # have to restart elevated, the new process imports them itself
         if not is_admin():
             logger.warning("Not running with admin privileges, requesting elevation")
             print("Network Monitor requires administrator privileges.")
@@ -807,6 +787,30 @@ def main():
             restart_as_admin()
             return 1
         
+        # Import here to avoid circular imports
+        try:
+            from .splash import run_with_splash, SplashScreen
+        except ImportError:
+            try:
+                from networkmonitor.splash import run_with_splash, SplashScreen
+            except ImportError:
+                # If splash screen can't be imported, create a minimal version
+                class SplashScreen:
+                    def update_status(self, msg, progress=None):
+                        logger.info(msg)
+                    
+                    def show(self):
+                        pass
+                    
+                    def close(self):
+                        pass
+                
+                def run_with_splash(target_function, *args, **kwargs):
+                    return target_function(*args, **kwargs)
+        
+        # Create splash screen
+        splash = SplashScreen()
+        
         splash.show()  # Show splash screen
         logger.info("Running with admin privileges")
         splash.update_status("Checking admin privileges", 10)
@@ -914,6 +918,7 @@ def main():
             splash.close()  # Close splash since we have the main window
             
             # Run the Tkinter main loop - this keeps the app alive
+            import tkinter as tk
             if isinstance(console_window, tk.Tk):
                 console_window.mainloop()
             
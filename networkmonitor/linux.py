@@ -6,46 +6,121 @@ import subprocess
 import re
 import socket
 import os
-from typing import List, Dict, Optional
+import shutil
+import struct
+import time
+import psutil
+from typing import Iterator, List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Linux routing table and the RTF_GATEWAY route flag, and the neighbour table
+PROC_NET_ROUTE = '/proc/net/route'
+RTF_GATEWAY = 0x2
+PROC_NET_ARP = '/proc/net/arp'
+
+# How long the default route's interface is reused before /proc/net/route is read again
+DEFAULT_INTERFACE_TTL = 30
+
+# ipset holding blocked IPs, matched by one DROP rule per chain and direction
+BLOCK_SET_NAME = "networkmonitor_block"
+BLOCK_SET_RULES = (("INPUT", "src"), ("OUTPUT", "dst"), ("FORWARD", "src"), ("FORWARD", "dst"))
+
+
+def _prefix_to_netmask(prefix: int) -> str:
+    """Dotted netmask for an IPv4 prefix length"""
+    return socket.inet_ntoa(struct.pack("!I", (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF))
+
+
+def _read_linux_default_route(path: str = PROC_NET_ROUTE) -> Tuple[Optional[str], Optional[str]]:
+    """Return (interface, gateway IP) of the lowest metric IPv4 default route"""
+    best = None
+    with open(path) as f:
+        next(f, None)  # Skip header
+        for line in f:
+            fields = line.split()
+            if len(fields) < 7 or fields[1] != '00000000' or not int(fields[3], 16) & RTF_GATEWAY:
+                continue
+            metric = int(fields[6])
+            if best is None or metric < best[0]:
+                # Addresses are little-endian hex
+                best = (metric, fields[0], socket.inet_ntoa(struct.pack('<L', int(fields[2], 16))))
+    return (best[1], best[2]) if best else (None, None)
+
+
+def _iter_linux_arp_table(path: str = PROC_NET_ARP) -> Iterator[Tuple[str, str]]:
+    """Yield (IP, MAC) for each neighbour the kernel has resolved, reading line by line"""
+    with open(path) as f:
+        next(f, None)  # Skip header
+        for line in f:
+            fields = line.split()
+            # Flags 0x0 marks an incomplete entry
+            if len(fields) >= 4 and int(fields[2], 16):
+                yield fields[0], fields[3].upper()
+
+
+def _read_linux_arp_entry(ip: str, path: str = PROC_NET_ARP) -> Optional[str]:
+    """Return the MAC the kernel has resolved for an IP, if any"""
+    return next((mac for entry_ip, mac in _iter_linux_arp_table(path) if entry_ip == ip), None)
+
+
 class LinuxNetworkMonitor:
     """Linux specific network functionality"""
     def __init__(self):
         self.is_admin = os.geteuid() == 0
         if not self.is_admin:
             logger.warning("Not running with root privileges - some features may be limited")
+        # (interface, time.monotonic() it expires at), see DEFAULT_INTERFACE_TTL
+        self._default_interface: Tuple[Optional[str], float] = (None, 0.0)
+        # Interface each pinned neighbour entry was added on, to delete it from there
+        self._pinned_interfaces: Dict[str, str] = {}
+        self._block_set_ready = False
+    
+    def _get_default_interface(self) -> Optional[str]:
+        """Interface of the default route (cached for DEFAULT_INTERFACE_TTL seconds)"""
+        interface, expires_at = self._default_interface
+        now = time.monotonic()
+        if interface is None or now >= expires_at:
+            interface, _ = _read_linux_default_route()
+            self._default_interface = (interface, now + DEFAULT_INTERFACE_TTL)
+        return interface
+    
+    def forget_default_interface(self):
+        """Look the default interface up again on next use, e.g. after the network changed"""
+        self._default_interface = (None, 0.0)
     
     def get_interfaces(self) -> List[Dict]:
         """Get all network interfaces"""
         interfaces = []
         try:
             # Use ip addr command to list interfaces
-            output = subprocess.check_output(["ip", "addr"], text=True)
+            # Keep the output as bytes and only decode the tokens we extract
+            output = subprocess.check_output(["ip", "addr"])
             
             current_interface = None
-            for line in output.splitlines():
-                line = line.strip()
-                
+            # Single pass over the raw lines: interface headers start with the
+            # index in column 0, their details follow on indented lines
+            for line in output.split(b"\n"):
                 # New interface definition starts with a number
-                if line[0].isdigit() and ":" in line:
-                    parts = line.split(":", 1)
-                    if len(parts) == 2:
-                        interface_name = parts[1].strip().split()[0]
-                        current_interface = {"name": interface_name, "ip": None, "mac": None}
-                        interfaces.append(current_interface)
+                if line[:1].isdigit():
+                    _, _, rest = line.partition(b":")
+                    interface_name = rest.partition(b":")[0].strip().partition(b"@")[0]
+                    current_interface = {"name": interface_name.decode(errors="replace"), "ip": None, "mac": None}
+                    interfaces.append(current_interface)
+                
+                elif current_interface is None:
+                    continue
                 
                 # MAC address line
-                elif current_interface and "link/ether" in line:
-                    mac = line.split()[1]
-                    current_interface["mac"] = mac
+                elif line.startswith(b"    link/ether "):
+                    current_interface["mac"] = line[15:].partition(b" ")[0].decode("ascii")
                 
-                # IP address line
-                elif current_interface and "inet " in line:
-                    ip_with_prefix = line.split()[1]
-                    ip = ip_with_prefix.split("/")[0]
-                    current_interface["ip"] = ip
+                # IP address line; the prefix length gives the netmask, so the
+                # scan does not need a separate getifaddrs() call for it
+                elif line.startswith(b"    inet "):
+                    address, _, rest = line[9:].partition(b"/")
+                    current_interface["ip"] = address.decode("ascii")
+                    current_interface["network_mask"] = _prefix_to_netmask(int(rest.partition(b" ")[0]))
             
             return interfaces
         except Exception as e:
@@ -57,26 +132,30 @@ class LinuxNetworkMonitor:
         wifi_interfaces = []
         
         try:
-            # First try using iwconfig
-            try:
-                output = subprocess.check_output(["iwconfig"], text=True, stderr=subprocess.STDOUT)
-                for line in output.splitlines():
-                    if "IEEE 802.11" in line:  # Indicates WiFi interface
-                        interface_name = line.split()[0]
-                        wifi_interfaces.append({"name": interface_name})
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                # Fallback to checking /sys/class/net for wireless devices
-                for interface in os.listdir("/sys/class/net"):
-                    if os.path.exists(f"/sys/class/net/{interface}/wireless"):
-                        wifi_interfaces.append({"name": interface})
-            
-            # Get more details for the WiFi interfaces
-            all_interfaces = self.get_interfaces()
-            for wifi_interface in wifi_interfaces:
-                for interface in all_interfaces:
-                    if interface["name"] == wifi_interface["name"]:
-                        wifi_interface.update(interface)
-                        break
+            # Single pass over /sys/class/net: wireless interfaces expose a
+            # `wireless` directory or `phy80211` link, and the MAC is in `address`
+            with os.scandir("/sys/class/net") as entries:
+                for entry in entries:
+                    if not (os.path.exists(os.path.join(entry.path, "wireless")) or
+                            os.path.exists(os.path.join(entry.path, "phy80211"))):
+                        continue
+                    
+                    mac = None
+                    try:
+                        with open(os.path.join(entry.path, "address")) as f:
+                            mac = f.read().strip() or None
+                    except OSError:
+                        pass
+                    wifi_interfaces.append({"name": entry.name, "ip": None, "mac": mac})
+            
+            # Fill in the IPv4 addresses for all of them from one getifaddrs() call
+            if wifi_interfaces:
+                addrs = psutil.net_if_addrs()
+                for wifi_interface in wifi_interfaces:
+                    for addr in addrs.get(wifi_interface["name"], []):
+                        if addr.family == socket.AF_INET:
+                            wifi_interface["ip"] = addr.address
+                            break
             
             return wifi_interfaces
         except Exception as e:
@@ -143,30 +222,23 @@ class LinuxNetworkMonitor:
             return False
             
         try:
-            # Find default interface
-            output = subprocess.check_output(["ip", "route"], text=True)
-            default_interface = None
-            for line in output.splitlines():
-                if line.startswith("default"):
-                    parts = line.split()
-                    default_interface = parts[4]
-                    break
-            
+            default_interface = self._get_default_interface()
             if not default_interface:
                 logger.error("Could not find default interface")
                 return False
             
-            # Clean up any existing tc rules
-            subprocess.call(["tc", "qdisc", "del", "dev", default_interface, "root"], stderr=subprocess.DEVNULL)
-            
-            # Set up tc hierarchy
-            subprocess.run(["tc", "qdisc", "add", "dev", default_interface, "root", "handle", "1:", "htb", "default", "30"], check=True)
-            subprocess.run(["tc", "class", "add", "dev", default_interface, "parent", "1:", "classid", "1:1", "htb", "rate", "1000mbit"], check=True)
-            subprocess.run(["tc", "class", "add", "dev", default_interface, "parent", "1:1", "classid", "1:10", "htb", "rate", f"{limit_kbps}kbit", "ceil", f"{limit_kbps}kbit", "prio", "1"], check=True)
-            
-            # Add filter for the specific IP
-            subprocess.run(["tc", "filter", "add", "dev", default_interface, "parent", "1:0", "protocol", "ip", "prio", "1", "u32", "match", "ip", "dst", ip, "flowid", "1:10"], check=True)
-            subprocess.run(["tc", "filter", "add", "dev", default_interface, "parent", "1:0", "protocol", "ip", "prio", "1", "u32", "match", "ip", "src", ip, "flowid", "1:10"], check=True)
+            # Reset and set up the tc hierarchy and the filters for the IP with one tc
+            # process. Replacing the root with a pfifo first throws away any existing
+            # htb tree (a plain del fails the batch when only the default qdisc is there)
+            commands = [
+                f"qdisc replace dev {default_interface} root handle 2: pfifo",
+                f"qdisc replace dev {default_interface} root handle 1: htb default 30",
+                f"class add dev {default_interface} parent 1: classid 1:1 htb rate 1000mbit",
+                f"class add dev {default_interface} parent 1:1 classid 1:10 htb rate {limit_kbps}kbit ceil {limit_kbps}kbit prio 1",
+                f"filter add dev {default_interface} parent 1:0 protocol ip prio 1 u32 match ip dst {ip} flowid 1:10",
+                f"filter add dev {default_interface} parent 1:0 protocol ip prio 1 u32 match ip src {ip} flowid 1:10",
+            ]
+            subprocess.run(["tc", "-batch", "-"], input="\n".join(commands) + "\n", text=True, check=True)
             
             logger.info(f"Speed limit of {limit_kbps}Kbps set for {ip}")
             return True
@@ -174,13 +246,49 @@ class LinuxNetworkMonitor:
             logger.error(f"Error limiting device speed: {e}")
             return False
     
+    def _ensure_block_set(self) -> bool:
+        """Create the block ipset and its DROP rules once, False if ipset is unavailable"""
+        if self._block_set_ready:
+            return True
+        if shutil.which("ipset") is None:
+            return False
+        
+        subprocess.run(["ipset", "create", BLOCK_SET_NAME, "hash:ip", "-exist"], check=True)
+        for chain, direction in BLOCK_SET_RULES:
+            rule = [chain, "-m", "set", "--match-set", BLOCK_SET_NAME, direction, "-j", "DROP"]
+            # -C checks for the rule so restarts don't stack duplicates
+            if subprocess.run(["iptables", "-C", *rule], capture_output=True).returncode != 0:
+                subprocess.run(["iptables", "-I", *rule], check=True)
+        self._block_set_ready = True
+        return True
+    
+    def _block_set_exists(self) -> bool:
+        """Whether the block ipset is there, without creating it"""
+        if self._block_set_ready:
+            return True
+        if shutil.which("ipset") is None:
+            return False
+        return subprocess.run(["ipset", "list", "-n", BLOCK_SET_NAME], capture_output=True).returncode == 0
+    
     def block_device(self, ip: str) -> bool:
         """
-        Block a device on the network using iptables
+        Block a device on the network using an ipset, or plain iptables rules without ipset
         
         Args:
             ip: IP address of device to block
             
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.block_devices([ip])
+    
+    def block_devices(self, ips: List[str]) -> bool:
+        """
+        Block several devices with a single ipset/iptables-restore process
+        
+        Args:
+            ips: IP addresses of devices to block
+            
         Returns:
             bool: True if successful, False otherwise
         """
@@ -189,13 +297,24 @@ class LinuxNetworkMonitor:
             return False
             
         try:
-            # Block incoming and outgoing traffic for the IP
-            subprocess.run(["iptables", "-A", "INPUT", "-s", ip, "-j", "DROP"], check=True)
-            subprocess.run(["iptables", "-A", "OUTPUT", "-d", ip, "-j", "DROP"], check=True)
-            subprocess.run(["iptables", "-A", "FORWARD", "-s", ip, "-j", "DROP"], check=True)
-            subprocess.run(["iptables", "-A", "FORWARD", "-d", ip, "-j", "DROP"], check=True)
+            if self._ensure_block_set():
+                # Hash inserts; blocking twice is a no-op
+                entries = "".join(f"add {BLOCK_SET_NAME} {ip}\n" for ip in ips)
+                subprocess.run(["ipset", "restore", "-exist"], input=entries, text=True, check=True)
+            else:
+                # Block incoming and outgoing traffic for the IPs, applied atomically by one process
+                rules = ["*filter"]
+                for ip in ips:
+                    rules += [
+                        f"-A INPUT -s {ip} -j DROP",
+                        f"-A OUTPUT -d {ip} -j DROP",
+                        f"-A FORWARD -s {ip} -j DROP",
+                        f"-A FORWARD -d {ip} -j DROP",
+                    ]
+                rules.append("COMMIT")
+                subprocess.run(["iptables-restore", "--noflush"], input="\n".join(rules) + "\n", text=True, check=True)
             
-            logger.info(f"Device {ip} blocked")
+            logger.info(f"Blocked {', '.join(ips)}")
             return True
         except Exception as e:
             logger.error(f"Error blocking device: {e}")
@@ -208,6 +327,18 @@ class LinuxNetworkMonitor:
         Args:
             ip: IP address of device to unblock
             
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.unblock_devices([ip])
+    
+    def unblock_devices(self, ips: List[str]) -> bool:
+        """
+        Unblock several devices, with a single ipset process when ipset is available
+        
+        Args:
+            ips: IP addresses of devices to unblock
+            
         Returns:
             bool: True if successful, False otherwise
         """
@@ -216,14 +347,81 @@ class LinuxNetworkMonitor:
             return False
             
         try:
-            # Remove blocking rules for the IP
-            subprocess.run(["iptables", "-D", "INPUT", "-s", ip, "-j", "DROP"], check=True)
-            subprocess.run(["iptables", "-D", "OUTPUT", "-d", ip, "-j", "DROP"], check=True)
-            subprocess.run(["iptables", "-D", "FORWARD", "-s", ip, "-j", "DROP"], check=True)
-            subprocess.run(["iptables", "-D", "FORWARD", "-d", ip, "-j", "DROP"], check=True)
+            # Only take IPs out of the set if there is one; unblocking shouldn't install it
+            if self._block_set_exists():
+                entries = "".join(f"del {BLOCK_SET_NAME} {ip}\n" for ip in ips)
+                subprocess.run(["ipset", "restore", "-exist"], input=entries, text=True, check=True)
+            
+            # IPs may also have been blocked with per-IP rules, before ipset was installed
+            # or by an older version. Deleted one by one: iptables-restore would abort on
+            # a rule that is already gone
+            for ip in ips:
+                for rule in (["INPUT", "-s", ip], ["OUTPUT", "-d", ip], ["FORWARD", "-s", ip], ["FORWARD", "-d", ip]):
+                    result = subprocess.run(["iptables", "-D", *rule, "-j", "DROP"], capture_output=True)
+                    # A rule that doesn't exist is already unblocked
+                    if result.returncode != 0 and b"matching rule" not in result.stderr:
+                        raise RuntimeError(f"iptables failed: {result.stderr.decode(errors='replace').strip()}")
             
-            logger.info(f"Device {ip} unblocked")
+            logger.info(f"Unblocked {', '.join(ips)}")
             return True
         except Exception as e:
             logger.error(f"Error unblocking device: {e}")
+            return False
+    
+    def pin_neighbor(self, ip: str, mac: str) -> bool:
+        """
+        Make this host's ARP entry for a device permanent so spoofed replies can't replace it
+        
+        Args:
+            ip: IP address of the device
+            mac: MAC address to pin the entry to
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.is_admin:
+            logger.error("Root privileges required to pin ARP entry")
+            return False
+            
+        try:
+            default_interface = self._get_default_interface()
+            if not default_interface:
+                logger.error("Could not find default interface")
+                return False
+            
+            subprocess.run(
+                ["ip", "neigh", "replace", ip, "lladdr", mac, "dev", default_interface, "nud", "permanent"],
+                capture_output=True, check=True
+            )
+            self._pinned_interfaces[ip] = default_interface
+            return True
+        except Exception as e:
+            logger.error(f"Error pinning ARP entry: {e}")
+            return False
+    
+    def unpin_neighbor(self, ip: str) -> bool:
+        """
+        Drop a pinned ARP entry so the kernel resolves the device again
+        
+        Args:
+            ip: IP address of the device
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            # The entry lives on the interface it was pinned on, even if the default route moved since
+            interface = self._pinned_interfaces.get(ip) or self._get_default_interface()
+            if not interface:
+                logger.error("Could not find default interface")
+                return False
+            
+            result = subprocess.run(["ip", "neigh", "del", ip, "dev", interface], capture_output=True)
+            # An entry that is already gone is already unpinned
+            if result.returncode != 0 and b"No such file" not in result.stderr:
+                raise RuntimeError(result.stderr.decode(errors='replace').strip())
+            self._pinned_interfaces.pop(ip, None)
+            return True
+        except Exception as e:
+            logger.error(f"Error unpinning ARP entry: {e}")
             return False
\ No newline at end of file
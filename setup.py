@@ -35,6 +35,12 @@ setup(
             "pywin32>=300",
             "wmi>=1.5.1",
         ],
+        "async-dns": [
+            "aiodns>=3.0.0",
+        ],
+        "ahocorasick": [
+            "pyahocorasick>=2.0.0",
+        ],
     },
     entry_points={
         "console_scripts": [
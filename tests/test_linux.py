@@ -0,0 +1,147 @@
+"""
+Tests for Linux-specific network functionality
+"""
+import pytest
+from types import SimpleNamespace
+from networkmonitor import linux
+from networkmonitor.linux import LinuxNetworkMonitor
+
+IP_ADDR_OUTPUT = b"""\
+1: lo: <LOOPBACK,UP,LOWER_UP> mtu 65536 qdisc noqueue state UNKNOWN group default qlen 1000
+    link/loopback 00:00:00:00:00:00 brd 00:00:00:00:00:00
+    inet 127.0.0.1/8 scope host lo
+       valid_lft forever preferred_lft forever
+2: eth0@if7: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 1500 qdisc noqueue state UP group default
+    link/ether 02:42:ac:11:00:02 brd ff:ff:ff:ff:ff:ff link-netnsid 0
+    inet 172.17.0.2/16 brd 172.17.255.255 scope global eth0
+       valid_lft forever preferred_lft forever
+3: wlan0: <BROADCAST,MULTICAST> mtu 1500 qdisc noop state DOWN group default qlen 1000
+    link/ether aa:bb:cc:dd:ee:ff brd ff:ff:ff:ff:ff:ff
+"""
+
+@pytest.fixture
+def linux_monitor(monkeypatch):
+    """LinuxNetworkMonitor with `ip addr` output stubbed out"""
+    monkeypatch.setattr(linux.os, "geteuid", lambda: 0, raising=False)
+    monkeypatch.setattr(linux.subprocess, "check_output", lambda *args, **kwargs: IP_ADDR_OUTPUT)
+    return LinuxNetworkMonitor()
+
+def test_get_interfaces_parses_ip_addr(linux_monitor):
+    """Test that interface names, MACs, IPv4 addresses and netmasks are extracted"""
+    assert linux_monitor.get_interfaces() == [
+        {"name": "lo", "ip": "127.0.0.1", "mac": None, "network_mask": "255.0.0.0"},
+        {"name": "eth0", "ip": "172.17.0.2", "mac": "02:42:ac:11:00:02", "network_mask": "255.255.0.0"},
+        {"name": "wlan0", "ip": None, "mac": "aa:bb:cc:dd:ee:ff"},
+    ]
+
+def test_read_linux_default_route_picks_lowest_metric(tmp_path):
+    """Test that the default gateway is decoded from /proc/net/route"""
+    route = tmp_path / "route"
+    route.write_text(
+        "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"
+        "wlan0\t00000000\t0101A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0\n"
+        "eth0\t00000000\t010200C0\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+        "eth0\t000200C0\t00000000\t0001\t0\t0\t100\t00FFFFFF\t0\t0\t0\n"
+    )
+    assert linux._read_linux_default_route(str(route)) == ("eth0", "192.0.2.1")
+
+def test_read_linux_arp_entry_skips_incomplete(tmp_path):
+    """Test that only resolved neighbours are returned from /proc/net/arp"""
+    arp = tmp_path / "arp"
+    arp.write_text(
+        "IP address       HW type     Flags       HW address            Mask     Device\n"
+        "192.0.2.7        0x1         0x0         00:00:00:00:00:00     *        eth0\n"
+        "192.0.2.1        0x1         0x2         02:fc:00:00:00:05     *        eth0\n"
+    )
+    assert linux._read_linux_arp_entry("192.0.2.1", str(arp)) == "02:FC:00:00:00:05"
+    assert linux._read_linux_arp_entry("192.0.2.7", str(arp)) is None
+
+def test_limit_device_speed_runs_one_tc_batch(linux_monitor, monkeypatch):
+    """Test that the tc reset and setup is one batch and the default interface is looked up once"""
+    routes = []
+    runs = []
+    monkeypatch.setattr(linux, "_read_linux_default_route", lambda: routes.append(1) or ("eth0", "192.0.2.1"))
+    monkeypatch.setattr(linux.subprocess, "call", lambda *args, **kwargs: pytest.fail("tc run outside the batch"))
+    monkeypatch.setattr(linux.subprocess, "run", lambda cmd, **kwargs: runs.append((cmd, kwargs.get("input"))))
+    
+    assert linux_monitor.limit_device_speed("192.0.2.7", 512)
+    assert linux_monitor.limit_device_speed("192.0.2.8", 512)
+    assert len(routes) == 1
+    assert [cmd for cmd, _ in runs] == [["tc", "-batch", "-"]] * 2
+    assert runs[0][1].startswith("qdisc replace dev eth0 root handle 2: pfifo\n")
+    assert "match ip dst 192.0.2.7 flowid 1:10" in runs[0][1]
+    assert "dev eth0" in runs[0][1]
+
+def test_block_device_uses_ipset(linux_monitor, monkeypatch):
+    """Test that blocking adds to one ipset and its DROP rules are only installed once"""
+    runs = []
+    
+    def run(cmd, **kwargs):
+        runs.append((cmd, kwargs.get("input")))
+        # No DROP rules exist yet for the -C checks
+        return SimpleNamespace(returncode=1 if cmd[1] == "-C" else 0)
+    
+    monkeypatch.setattr(linux.shutil, "which", lambda name: f"/usr/sbin/{name}")
+    monkeypatch.setattr(linux.subprocess, "run", run)
+    
+    assert linux_monitor.block_device("192.0.2.7")
+    assert linux_monitor.block_devices(["192.0.2.8", "192.0.2.9"])
+    assert linux_monitor.unblock_device("192.0.2.7")
+    assert sum(cmd[:2] == ["iptables", "-I"] for cmd, _ in runs) == 4
+    assert [run for run in runs if run[0][0] == "ipset" and run[0][1] == "restore"] == [
+        (["ipset", "restore", "-exist"], f"add {linux.BLOCK_SET_NAME} 192.0.2.7\n"),
+        (["ipset", "restore", "-exist"], f"add {linux.BLOCK_SET_NAME} 192.0.2.8\nadd {linux.BLOCK_SET_NAME} 192.0.2.9\n"),
+        (["ipset", "restore", "-exist"], f"del {linux.BLOCK_SET_NAME} 192.0.2.7\n"),
+    ]
+
+def test_unblock_without_block_set_removes_legacy_rules_only(linux_monitor, monkeypatch):
+    """Test that unblocking doesn't create the ipset and still removes per-IP DROP rules"""
+    runs = []
+    
+    def run(cmd, **kwargs):
+        runs.append(cmd)
+        if cmd[:2] == ["ipset", "list"]:
+            return SimpleNamespace(returncode=1, stderr=b"The set with the given name does not exist")
+        # Only the INPUT rule is left from the per-IP fallback
+        if cmd[:2] == ["iptables", "-D"] and cmd[2] != "INPUT":
+            return SimpleNamespace(returncode=1, stderr=b"iptables: Bad rule (does a matching rule exist in that chain?).")
+        return SimpleNamespace(returncode=0, stderr=b"")
+    
+    monkeypatch.setattr(linux.shutil, "which", lambda name: f"/usr/sbin/{name}")
+    monkeypatch.setattr(linux.subprocess, "run", run)
+    
+    assert linux_monitor.unblock_device("192.0.2.7")
+    assert not any(cmd[:2] in (["ipset", "create"], ["ipset", "restore"], ["iptables", "-I"]) for cmd in runs)
+    assert sum(cmd[:2] == ["iptables", "-D"] for cmd in runs) == 4
+
+def test_pin_neighbor_makes_entry_permanent(linux_monitor, monkeypatch):
+    """Test that pinning replaces the entry with a permanent one and unpinning deletes it"""
+    runs = []
+    monkeypatch.setattr(linux, "_read_linux_default_route", lambda: ("eth0", "192.0.2.1"))
+    monkeypatch.setattr(linux.subprocess, "run", lambda cmd, **kwargs: runs.append(cmd) or SimpleNamespace(returncode=0))
+    
+    assert linux_monitor.pin_neighbor("192.0.2.7", "02:fc:00:00:00:07")
+    assert linux_monitor.unpin_neighbor("192.0.2.7")
+    assert runs == [
+        ["ip", "neigh", "replace", "192.0.2.7", "lladdr", "02:fc:00:00:00:07", "dev", "eth0", "nud", "permanent"],
+        ["ip", "neigh", "del", "192.0.2.7", "dev", "eth0"],
+    ]
+
+def test_default_interface_is_looked_up_again_after_ttl(linux_monitor, monkeypatch):
+    """Test that a route change is picked up once the cached default interface expires"""
+    routes = iter([("wlan0", "192.0.2.1"), ("eth0", "192.0.2.1")])
+    clock = iter([100.0, 101.0, 100.0 + linux.DEFAULT_INTERFACE_TTL])
+    monkeypatch.setattr(linux, "_read_linux_default_route", lambda: next(routes))
+    monkeypatch.setattr(linux.time, "monotonic", lambda: next(clock))
+    
+    assert linux_monitor._get_default_interface() == "wlan0"
+    assert linux_monitor._get_default_interface() == "wlan0"
+    assert linux_monitor._get_default_interface() == "eth0"
+
+def test_pin_neighbor_without_default_route(linux_monitor, monkeypatch):
+    """Test that pinning fails cleanly instead of running ip with no device"""
+    monkeypatch.setattr(linux, "_read_linux_default_route", lambda: (None, None))
+    monkeypatch.setattr(linux.subprocess, "run", lambda cmd, **kwargs: pytest.fail("ip run without a device"))
+    
+    assert not linux_monitor.pin_neighbor("192.0.2.7", "02:fc:00:00:00:07")
+    assert not linux_monitor.unpin_neighbor("192.0.2.7")
@@ -0,0 +1,798 @@
+"""
+Tests for the core network monitoring logic
+"""
+import time
+import asyncio
+import threading
+import ipaddress
+import pytest
+from types import SimpleNamespace
+from networkmonitor import monitor
+
+def test_oui_key_normalizes_separators():
+    """Test that colon, dash and bare MACs map to the same 24-bit OUI"""
+    assert monitor._oui_key("b8:27:eb:12:34:56") == 0xB827EB
+    assert monitor._oui_key("B8-27-EB-12-34-56") == 0xB827EB
+    assert monitor._oui_key("b827eb123456") == 0xB827EB
+    assert monitor._oui_key("b827.eb12.3456") == 0xB827EB
+
+def test_load_oui_table_merges_ieee_registry(tmp_path):
+    """Test that the IEEE CSV is merged over the builtin vendor prefixes"""
+    csv_path = tmp_path / "oui.csv"
+    csv_path.write_text(
+        "Registry,Assignment,Organization Name,Organization Address\n"
+        "MA-L,001122,Example Networks,Somewhere\n"
+    )
+    table = monitor._load_oui_table(str(csv_path))
+    assert table[0x001122] == "Example Networks"
+    assert table[0xB827EB] == "Raspberry Pi Foundation"
+
+def test_oui_table_is_stale_by_age(tmp_path, monkeypatch):
+    """Test that a missing or week-old registry download is refreshed"""
+    csv_path = tmp_path / "oui.csv"
+    assert monitor._oui_table_is_stale(str(csv_path))
+    csv_path.write_text("Registry,Assignment,Organization Name\n")
+    assert not monitor._oui_table_is_stale(str(csv_path))
+    monkeypatch.setattr(monitor.time, "time", lambda: csv_path.stat().st_mtime + monitor.OUI_REFRESH_AGE + 1)
+    assert monitor._oui_table_is_stale(str(csv_path))
+
+@pytest.fixture
+def controller(monkeypatch):
+    """NetworkController with hostname and vendor lookups stubbed out"""
+    controller = monitor.NetworkController()
+    monkeypatch.setattr(monitor, "aiodns", None)
+    monkeypatch.setattr(controller, "_resolve_hostname", lambda ip: f"host-{ip}")
+    monkeypatch.setattr(controller, "_get_mac_vendor", lambda mac: "Apple, Inc.")
+    monkeypatch.setattr(monitor, "download_oui_table", lambda: False)
+    # Keep tests from changing this host's firewall or ARP table
+    controller.platform_monitor = None
+    return controller
+
+def test_register_devices_enriches_new_and_refreshes_known(controller):
+    """Test that new responders are enriched and known ones are reused"""
+    now = time.monotonic()
+    first = controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], now)
+    assert first[0].hostname == "host-10.0.0.2"
+    assert first[0].vendor == "Apple, Inc."
+    
+    controller.devices["10.0.0.2"].status = "inactive"
+    second = controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], now)
+    assert second[0] is first[0]
+    assert second[0].status == "active"
+
+def test_resolve_ptrs_bounds_each_query(controller, monkeypatch):
+    """Test that PTR queries run concurrently and c-ares is held to the scan's timeout"""
+    resolvers = []
+    
+    class FakeResolver:
+        def __init__(self, **kwargs):
+            resolvers.append(kwargs)
+        async def gethostbyaddr(self, ip):
+            if ip == "10.0.0.3":
+                raise OSError("NXDOMAIN")
+            return SimpleNamespace(name=f"ptr-{ip}")
+    
+    monkeypatch.setattr(monitor, "aiodns", SimpleNamespace(DNSResolver=FakeResolver))
+    names = asyncio.run(controller._resolve_ptrs(["10.0.0.2", "10.0.0.3"], timeout=0.25))
+    assert names == {"10.0.0.2": "ptr-10.0.0.2", "10.0.0.3": None}
+    assert resolvers == [{"timeout": 0.25, "tries": 1}]
+
+def test_slow_netbios_lookup_does_not_hold_the_scan(controller, monkeypatch):
+    """Test that NetBIOS fallbacks after aiodns share the hostname deadline and cache late names"""
+    release = threading.Event()
+    
+    async def resolve_ptrs(ips):
+        return {ip: None for ip in ips}
+    
+    def resolve_netbios(ip):
+        release.wait(5)
+        return "DESKTOP-1"
+    
+    monkeypatch.setattr(monitor, "aiodns", SimpleNamespace())
+    monkeypatch.setattr(monitor, "HOSTNAME_LOOKUP_TIMEOUT", 0.05)
+    monkeypatch.setattr(controller, "os_type", "Windows")
+    monkeypatch.setattr(controller, "_resolve_ptrs", resolve_ptrs)
+    monkeypatch.setattr(controller, "_resolve_netbios", resolve_netbios)
+    monkeypatch.setattr(controller, "_get_mac_vendor", lambda mac: None)
+    
+    started = time.monotonic()
+    devices = controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], started)
+    assert time.monotonic() - started < 2
+    assert devices[0].hostname is None
+    
+    release.set()
+    deadline = time.monotonic() + 2
+    while controller.hostname_cache.get("10.0.0.2") != "DESKTOP-1" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert controller.hostname_cache.get("10.0.0.2") == "DESKTOP-1"
+
+def test_register_devices_looks_up_each_oui_once(controller, monkeypatch):
+    """Test that new devices sharing an OUI share one vendor lookup"""
+    lookups = []
+    monkeypatch.setattr(controller, "_get_mac_vendor", lambda mac: lookups.append(mac) or "Apple, Inc.")
+    devices = controller._register_devices([
+        ("10.0.0.2", "AA:BB:CC:00:00:01"),
+        ("10.0.0.3", "AA:BB:CC:00:00:02"),
+        ("10.0.0.4", "B8:27:EB:00:00:03"),
+    ], time.monotonic())
+    assert len(lookups) == 2
+    assert all(device.vendor == "Apple, Inc." for device in devices)
+
+@pytest.mark.parametrize("hostname,vendor,expected", [
+    ("Johns-iPhone", None, "Smartphone"),
+    (None, "Samsung TV Inc.", "Smartphone"),
+    ("living-room-roku", "Roku, Inc.", "Smart Tv"),
+    ("printer", "Canon", "Unknown"),
+    (None, None, "Unknown"),
+])
+@pytest.mark.parametrize("use_automaton", [True, False])
+def test_guess_device_type(controller, hostname, vendor, expected, use_automaton):
+    """Test keyword based device type classification and its precedence"""
+    if not use_automaton:
+        controller._device_type_automaton = None
+    assert controller.guess_device_type(hostname, vendor) == expected
+
+def test_guess_device_type_classifies_each_pair_once(controller):
+    """Test that devices sharing a hostname/vendor pair reuse the first classification"""
+    for _ in range(3):
+        assert controller.guess_device_type(None, "Roku, Inc.") == "Smart Tv"
+    info = controller._classify_device.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+def test_update_device_speeds_uses_per_nic_delta(controller, monkeypatch):
+    """Test that bandwidth is a rate over the sampling interval, not a byte total"""
+    counters = iter([
+        {"eth0": (1_000_000, 0), "lo": (5_000_000, 5_000_000)},
+        {"eth0": (1_500_000, 500_000), "lo": (9_000_000, 9_000_000)},
+    ])
+    clock = iter([100.0, 102.0])
+    monkeypatch.setattr(monitor.time, "monotonic", lambda: next(clock))
+    monkeypatch.setattr(monitor.psutil, "net_io_counters", lambda pernic: {
+        nic: SimpleNamespace(bytes_sent=sent, bytes_recv=recv)
+        for nic, (sent, recv) in next(counters).items()
+    })
+    
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01"), ("10.0.0.3", "AA:BB:CC:00:00:02")], 100.0)
+    
+    controller._update_device_speeds()
+    assert controller.total_bandwidth == 0.0
+    controller._update_device_speeds()
+    assert controller.total_bandwidth == pytest.approx(4.0)
+    assert [device.current_speed for device in controller.devices.values()] == [pytest.approx(2.0)] * 2
+
+def test_update_device_speeds_prefers_platform_counters(controller, monkeypatch):
+    """Test that platform byte counters are used when available and psutil only as a fallback"""
+    counters = iter([{"Ethernet": 1_000_000}, None])
+    clock = iter([100.0, 101.0])
+    monkeypatch.setattr(monitor.time, "monotonic", lambda: next(clock))
+    controller.platform_monitor = SimpleNamespace(get_io_counters=lambda: next(counters))
+    monkeypatch.setattr(monitor.psutil, "net_io_counters", lambda pernic: {
+        "Ethernet": SimpleNamespace(bytes_sent=1_250_000, bytes_recv=0),
+    })
+    
+    controller._update_device_speeds()
+    controller._update_device_speeds()
+    assert controller.total_bandwidth == pytest.approx(2.0)
+
+@pytest.mark.parametrize("iface,expected", [
+    ({"name": "eth0", "ip": "10.1.2.3", "network_mask": "255.255.255.192"}, "10.1.2.0/26"),
+    ({"name": "eth0", "ip": "10.1.6.3", "network_mask": "255.255.252.0"}, "10.1.4.0/22"),
+    ({"name": "eth0", "ip": "10.1.2.3", "network_mask": "255.0.0.0"}, "10.1.2.0/24"),
+])
+def test_get_scan_network_uses_netmask(controller, iface, expected):
+    """Test that the scanned network follows the interface netmask, clamped for huge networks"""
+    assert str(controller._get_scan_network(iface)) == expected
+
+@pytest.mark.skipif(not monitor.DATACLASS_SLOTS, reason="dataclass slots need Python 3.10+")
+def test_device_uses_slots():
+    """Test that devices carry no per-instance __dict__ and reject unknown attributes"""
+    device = monitor.Device("10.0.0.2", "AA:BB:CC:00:00:01")
+    assert not hasattr(device, "__dict__")
+    with pytest.raises(AttributeError):
+        device.nickname = "tv"
+
+def test_get_scan_network_remembers_looked_up_netmask(controller, monkeypatch):
+    """Test that a netmask missing from the interface entry is looked up once"""
+    lookups = []
+    addr = SimpleNamespace(family=monitor.socket.AF_INET, address="10.1.6.3", netmask="255.255.252.0")
+    monkeypatch.setattr(monitor.psutil, "net_if_addrs", lambda: lookups.append(1) or {"eth0": [addr]})
+    iface = {"name": "eth0", "ip": "10.1.6.3"}
+    
+    assert str(controller._get_scan_network(iface)) == "10.1.4.0/22"
+    assert str(controller._get_scan_network(iface)) == "10.1.4.0/22"
+    assert len(lookups) == 1
+
+def test_signal_strength_queries_platform_once_per_snapshot(controller, monkeypatch):
+    """Test that one WiFi snapshot serves lookups for every device"""
+    calls = []
+    
+    class PlatformMonitor:
+        def get_wifi_signal_strength(self):
+            calls.append(1)
+            return {"Wi-Fi": {"bssid": "aa-bb-cc-dd-ee-ff", "signal_strength": 87}}
+    
+    monkeypatch.setattr(controller, "platform_monitor", PlatformMonitor())
+    assert controller.get_signal_strength("AA:BB:CC:DD:EE:FF") == 87
+    assert controller.get_signal_strength("11:22:33:44:55:66") is None
+    assert len(calls) == 1
+
+def test_expire_devices_marks_missing_inactive_and_forgets_old(controller):
+    """Test that missing devices go inactive after the grace period and are eventually dropped"""
+    now = time.monotonic()
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01"), ("10.0.0.3", "AA:BB:CC:00:00:02")], now)
+    
+    later = now + monitor.DEVICE_INACTIVE_AFTER + 1
+    discovered = controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], later)
+    controller._expire_devices(discovered, later)
+    assert controller.devices["10.0.0.2"].status == "active"
+    assert controller.devices["10.0.0.3"].status == "inactive"
+    
+    # Expiry goes by time unseen, however few scans a backed-off loop ran meanwhile
+    devices = controller.devices
+    controller._scan_id = monitor.DEVICE_EXPIRY_CHECK_INTERVAL - 1
+    controller._expire_devices([], now + monitor.DEVICE_EXPIRY_AFTER - 1)
+    assert controller.devices is devices
+    
+    controller._scan_id = monitor.DEVICE_EXPIRY_CHECK_INTERVAL * 2 - 1
+    controller._expire_devices([], later + monitor.DEVICE_EXPIRY_AFTER + 1)
+    assert controller.devices == {}
+
+def test_monitor_loop_backs_off_while_devices_are_stable(controller, monkeypatch):
+    """Test that the scan interval doubles for a stable network and the loop stops on the event"""
+    waits = []
+    
+    def wait(timeout):
+        waits.append(timeout)
+        return len(waits) == 5
+    
+    device = monitor.Device("10.0.0.2", "AA:BB:CC:00:00:01")
+    monkeypatch.setattr(controller, "get_connected_devices", lambda: [device])
+    monkeypatch.setattr(controller._stop_event, "wait", wait)
+    
+    controller._monitor_loop()
+    assert waits == [5, 5, 5, 10, 20]
+
+def test_monitor_interval_is_set_by_constructor():
+    """Test that the scan interval can be configured and is clamped to one second"""
+    assert monitor.NetworkController(monitor_interval=15).monitor_interval == 15
+    assert monitor.NetworkController(monitor_interval=0).monitor_interval == 1
+
+def test_monitor_interval_round_trips_while_backed_off(controller):
+    """Test that reading and writing back the interval doesn't raise the floor to the backoff"""
+    controller.monitor_interval = 5
+    controller._interval = 40
+    controller.monitor_interval = controller.monitor_interval
+    assert controller.monitor_interval == 5
+
+def test_stop_monitoring_returns_promptly(controller, monkeypatch):
+    """Test that the scan and speed threads both exit as soon as monitoring is stopped"""
+    speed_updates = []
+    monkeypatch.setattr(controller, "get_connected_devices", lambda: [])
+    monkeypatch.setattr(controller, "_update_device_speeds", lambda: speed_updates.append(1))
+    monkeypatch.setattr(controller, "save_vendor_cache", lambda: None)
+    
+    controller.start_monitoring()
+    time.sleep(0.1)
+    started = time.monotonic()
+    controller.stop_monitoring()
+    assert time.monotonic() - started < 1
+    assert speed_updates
+    assert not controller.monitoring_thread.is_alive()
+    assert not controller.speed_thread.is_alive()
+
+def test_concurrent_scans_do_not_drop_each_others_devices(controller, monkeypatch):
+    """Test that a scan publishing while another is mid-merge doesn't lose either's devices"""
+    in_merge = threading.Event()
+    release = threading.Event()
+    
+    def guess_device_type(hostname, vendor):
+        if vendor == "Slow":
+            in_merge.set()
+            release.wait(5)
+        return "Unknown"
+    
+    monkeypatch.setattr(controller, "_get_mac_vendor", lambda mac: "Slow" if mac.endswith("01") else None)
+    monkeypatch.setattr(controller, "guess_device_type", guess_device_type)
+    monkeypatch.setattr(monitor, "aiodns", None)
+    monkeypatch.setattr(controller, "_resolve_hostname", lambda ip: None)
+    
+    slow = threading.Thread(target=controller._register_devices, args=([("10.0.0.2", "AA:BB:CC:00:00:01")], 100.0))
+    slow.start()
+    assert in_merge.wait(5)
+    fast = threading.Thread(target=controller._register_devices, args=([("10.0.0.3", "AA:BB:CC:00:00:02")], 100.0))
+    fast.start()
+    fast.join(0.2)
+    release.set()
+    slow.join(5)
+    fast.join(5)
+    assert set(controller.devices) == {"10.0.0.2", "10.0.0.3"}
+
+def test_speed_loop_keeps_a_fixed_cadence(controller, monkeypatch):
+    """Test that sampling time doesn't delay later ticks and stalled ticks are skipped"""
+    clock = iter([100.0, 100.5, 102.5, 109.0])
+    waits = []
+    monkeypatch.setattr(monitor.time, "monotonic", lambda: next(clock))
+    monkeypatch.setattr(controller, "_update_device_speeds", lambda: None)
+    monkeypatch.setattr(controller._stop_event, "wait", lambda timeout: waits.append(timeout) or len(waits) == 3)
+    
+    controller._speed_loop()
+    assert waits == [pytest.approx(monitor.SPEED_UPDATE_INTERVAL - 0.5),
+                     pytest.approx(2 * monitor.SPEED_UPDATE_INTERVAL - 2.5),
+                     pytest.approx(1.0)]
+
+def test_arp_scan_fallback_uses_scanned_interface(controller, monkeypatch):
+    """Test that Scapy chunk scans go out on the interface the range belongs to"""
+    calls = []
+    
+    def scan_fast(*args):
+        raise OSError("no raw sockets")
+    
+    monkeypatch.setattr(controller, "_arp_scan_fast", scan_fast)
+    monkeypatch.setattr(controller, "_arp_scan_chunk", lambda chunk, iface: calls.append((chunk, iface)) or [])
+    controller._arp_scan(ipaddress.IPv4Network("10.0.0.0/25"), None, "10.0.0.5", "eth1")
+    assert sorted(calls) == [("10.0.0.0/26", "eth1"), ("10.0.0.64/26", "eth1")]
+
+def test_scan_uses_bsd_device_of_macos_interfaces(controller, monkeypatch):
+    """Test that scans go out on the BSD device, not the macOS hardware port label"""
+    scans = []
+    monkeypatch.setattr(controller, "get_interfaces", lambda: [
+        {"name": "Wi-Fi", "device": "en0", "mac": "aa:bb:cc:dd:ee:ff", "ip": "10.0.0.5", "network_mask": "255.255.255.0"},
+    ])
+    monkeypatch.setattr(controller, "_arp_scan",
+                        lambda network, interface, local_ip, local_iface: scans.append(local_iface) or [])
+    
+    controller.get_connected_devices()
+    assert scans == ["en0"]
+
+def test_get_all_devices_reports_wall_clock_last_seen(controller):
+    """Test that monotonic last-seen times are listed as wall-clock timestamps"""
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], time.monotonic() - 30)
+    listed = monitor.datetime.fromisoformat(controller.get_all_devices()[0]["last_seen"])
+    assert abs((monitor.datetime.now() - listed).total_seconds() - 30) < 1
+    assert abs((controller.devices["10.0.0.2"].last_seen - listed).total_seconds()) < 1
+
+def test_register_devices_publishes_a_new_devices_dict(controller):
+    """Test that readers holding the old devices dict never see it change"""
+    snapshot = controller.devices
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], time.monotonic())
+    assert snapshot == {}
+    assert list(controller.devices) == ["10.0.0.2"]
+
+def test_ttl_cache_expires_failures_sooner(monkeypatch):
+    """Test that cached None values expire after the negative TTL"""
+    now = [0.0]
+    monkeypatch.setattr(monitor.time, "monotonic", lambda: now[0])
+    cache = monitor.TTLCache(maxsize=2, ttl=3600, negative_ttl=60)
+    cache.set("10.0.0.2", "printer.local")
+    cache.set("10.0.0.3", None)
+    
+    now[0] = 61
+    assert cache.get("10.0.0.2") == "printer.local"
+    assert cache.get("10.0.0.3") is monitor.TTLCache.MISSING
+    
+    cache.set("10.0.0.4", "nas.local")
+    cache.set("10.0.0.5", "tv.local")
+    assert cache.get("10.0.0.2") is monitor.TTLCache.MISSING
+
+def test_vendor_lookups_back_off_when_rate_limited(controller, monkeypatch):
+    """Test that a 429 stops online vendor lookups for the Retry-After period"""
+    lookups = []
+    
+    def lookup(oui):
+        lookups.append(oui)
+        response = monitor.requests.Response()
+        response.status_code = 429
+        response.headers["Retry-After"] = "30"
+        raise monitor.requests.HTTPError(response=response)
+    
+    monkeypatch.setattr(monitor, "_lookup_vendor_online", lookup)
+    get_mac_vendor = monitor.NetworkController._get_mac_vendor
+    assert get_mac_vendor(controller, "12:34:56:00:00:01") is None
+    assert get_mac_vendor(controller, "12:34:57:00:00:01") is None
+    assert lookups == ["123456"]
+    assert 29 < controller._vendor_api_retry_at - time.monotonic() <= 30
+
+def test_unknown_vendor_is_looked_up_again_after_negative_ttl(controller, monkeypatch):
+    """Test that a 404 from the vendor API is only cached for NEGATIVE_CACHE_TTL"""
+    requested = []
+    now = [1000.0]
+    
+    def get(url, timeout):
+        requested.append(url)
+        response = monitor.requests.Response()
+        response.status_code = 404
+        return response
+    
+    monkeypatch.setattr(monitor, "_vendor_session", lambda: SimpleNamespace(get=get))
+    monkeypatch.setattr(monitor.time, "monotonic", lambda: now[0])
+    get_mac_vendor = monitor.NetworkController._get_mac_vendor
+    
+    assert get_mac_vendor(controller, "12:34:56:00:00:01") is None
+    assert get_mac_vendor(controller, "12:34:56:00:00:02") is None
+    assert len(requested) == 1
+    now[0] += monitor.NEGATIVE_CACHE_TTL + 1
+    assert get_mac_vendor(controller, "12:34:56:00:00:01") is None
+    assert len(requested) == 2
+
+def test_vendor_cache_round_trips_through_disk(controller, tmp_path):
+    """Test that saved vendor lookups seed the cache of the next controller"""
+    path = str(tmp_path / "ouicache.json")
+    controller.mac_vendor_cache.set(0x001122, "Example Networks")
+    controller.mac_vendor_cache.set(0x334455, None)
+    assert controller.save_vendor_cache(path)
+    
+    restored = monitor.NetworkController()
+    restored._load_vendor_cache(path)
+    assert restored.mac_vendor_cache.get(0x001122) == "Example Networks"
+    assert restored.mac_vendor_cache.get(0x334455) is monitor.TTLCache.MISSING
+
+def test_register_devices_fills_in_late_hostnames(controller, monkeypatch):
+    """Test that a slow PTR lookup doesn't block the scan and is used on the next one"""
+    def slow_resolve(ip):
+        time.sleep(0.2)
+        controller.hostname_cache.set(ip, "living-room-roku")
+        return "living-room-roku"
+    
+    monkeypatch.setattr(monitor, "HOSTNAME_LOOKUP_TIMEOUT", 0.05)
+    monkeypatch.setattr(controller, "_resolve_hostname", slow_resolve)
+    now = time.monotonic()
+    first = controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], now)
+    assert first[0].hostname is None
+    
+    time.sleep(0.3)
+    second = controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], now)
+    assert second[0].hostname == "living-room-roku"
+
+def test_cut_and_protect_share_one_arp_scheduler(controller, monkeypatch):
+    """Test that cut/protect frames are re-sent by one thread until their jobs are removed"""
+    sent = []
+    monkeypatch.setattr(monitor, "ARP_REFRESH_INTERVAL", 0.01)
+    monkeypatch.setattr(monitor, "get_if_hwaddr", lambda iface: "02:00:00:00:00:99", raising=False)
+    monkeypatch.setattr(controller, "get_default_interface", lambda: "eth0")
+    monkeypatch.setattr(controller, "_get_gateway_info", lambda: ("10.0.0.1", "02:00:00:00:00:01"))
+    monkeypatch.setattr(controller, "_send_frames", lambda frames: sent.append(len(frames)))
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01"), ("10.0.0.3", "AA:BB:CC:00:00:02")],
+                                 time.monotonic())
+    time.sleep(0.05)
+    baseline_threads = threading.active_count()
+    
+    assert controller.cut_device("10.0.0.2")
+    assert controller.protect_device("10.0.0.3")
+    time.sleep(0.1)
+    assert sum(sent) >= 8
+    assert threading.active_count() - baseline_threads <= 1
+    assert [thread.name for thread in threading.enumerate()].count("arp-scheduler") == 1
+    
+    assert controller.protect_device("10.0.0.3")
+    assert controller.protected_devices == {"10.0.0.3"}
+    
+    controller.stop_cut("10.0.0.2")
+    controller.unprotect_device("10.0.0.3")
+    assert controller.protected_devices == set()
+    time.sleep(0.1)
+    assert controller._arp_jobs == {}
+    assert controller._arp_scheduler is None
+
+def test_arp_frame_matches_scapy(controller, monkeypatch):
+    """Test that the hand-packed ARP reply is byte-for-byte what Scapy would build"""
+    scapy = pytest.importorskip("scapy.all")
+    monkeypatch.setattr(controller, "_get_local_mac", lambda: "02:00:00:00:00:99")
+    
+    expected = bytes(
+        scapy.Ether(dst="aa:bb:cc:00:00:01", src="02:00:00:00:00:99") /
+        scapy.ARP(op=2, pdst="10.0.0.2", hwdst="aa:bb:cc:00:00:01", psrc="10.0.0.1", hwsrc="02:00:00:00:00:01")
+    )
+    assert controller._arp_frame("10.0.0.2", "AA:BB:CC:00:00:01", "10.0.0.1", "02:00:00:00:00:01") == expected
+
+def test_wifi_interfaces_are_cached_until_invalidated(controller, monkeypatch):
+    """Test that WiFi interface detection isn't repeated on every call"""
+    queries = []
+    monkeypatch.setattr(controller, "_query_wifi_interfaces", lambda: queries.append(1) or ["wlan0"])
+    
+    assert controller.get_wifi_interfaces() == ["wlan0"]
+    assert controller.get_wifi_interfaces() == ["wlan0"]
+    assert len(queries) == 1
+    
+    controller.invalidate_interface_cache()
+    controller.get_wifi_interfaces()
+    assert len(queries) == 2
+
+def test_windows_wifi_interfaces_skip_ipconfig_with_platform_monitor(controller, monkeypatch):
+    """Test that ipconfig is only parsed when there is no Windows platform monitor"""
+    controller.os_type = "Windows"
+    controller.platform_monitor = SimpleNamespace(get_wifi_interfaces=lambda: [])
+    monkeypatch.setattr(monitor.subprocess, "check_output", lambda *args, **kwargs: pytest.fail("ipconfig was run"))
+    monkeypatch.setattr(controller, "get_interfaces", lambda: [{"name": "Wireless Network Connection"}])
+    
+    assert controller._query_wifi_interfaces() == ["Wireless Network Connection"]
+
+def test_local_mac_is_looked_up_once(controller, monkeypatch):
+    """Test that our interface MAC is reused until the interface cache is invalidated"""
+    lookups = []
+    monkeypatch.setattr(monitor, "get_if_hwaddr", lambda iface: lookups.append(iface) or "02:00:00:00:00:99",
+                        raising=False)
+    monkeypatch.setattr(controller, "_query_default_interface", lambda: "eth0")
+    
+    assert controller._get_local_mac() == "02:00:00:00:00:99"
+    assert controller._get_local_mac() == "02:00:00:00:00:99"
+    assert lookups == ["eth0"]
+    
+    controller.invalidate_interface_cache()
+    controller._get_local_mac()
+    assert lookups == ["eth0", "eth0"]
+
+def test_protect_device_ends_running_cut(controller, monkeypatch):
+    """Test that protecting a device being cut leaves only the protection job scheduled"""
+    monkeypatch.setattr(monitor, "get_if_hwaddr", lambda iface: "02:00:00:00:00:99", raising=False)
+    monkeypatch.setattr(controller, "get_default_interface", lambda: "eth0")
+    monkeypatch.setattr(controller, "_get_gateway_info", lambda: ("10.0.0.1", "02:00:00:00:00:01"))
+    monkeypatch.setattr(controller, "_send_frames", lambda frames: None)
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], time.monotonic())
+    
+    assert controller.cut_device("10.0.0.2")
+    assert controller.protect_device("10.0.0.2")
+    assert list(controller._arp_jobs) == [("protect", "10.0.0.2")]
+    assert controller.devices["10.0.0.2"].attack_status == "none"
+    controller.unprotect_device("10.0.0.2")
+
+def test_repeated_protect_and_cut_are_no_ops(controller, monkeypatch):
+    """Test that protecting or cutting a device twice doesn't rebuild its ARP job"""
+    lookups = []
+    monkeypatch.setattr(monitor, "get_if_hwaddr", lambda iface: "02:00:00:00:00:99", raising=False)
+    monkeypatch.setattr(controller, "get_default_interface", lambda: "eth0")
+    monkeypatch.setattr(controller, "_get_gateway_info", lambda: lookups.append(1) or ("10.0.0.1", "02:00:00:00:00:01"))
+    monkeypatch.setattr(controller, "_send_frames", lambda frames: None)
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01"), ("10.0.0.3", "AA:BB:CC:00:00:02")], time.monotonic())
+    
+    assert controller.protect_device("10.0.0.2")
+    assert controller.protect_device("10.0.0.2")
+    assert controller.cut_device("10.0.0.3")
+    assert controller.cut_device("10.0.0.3")
+    assert len(lookups) == 2
+    assert sorted(controller._arp_jobs) == [("cut", "10.0.0.3"), ("protect", "10.0.0.2")]
+    controller.unprotect_device("10.0.0.2")
+    controller.stop_cut("10.0.0.3")
+
+def test_stop_cut_restores_arp_in_one_batch(controller, monkeypatch):
+    """Test that ending a cut sends the corrected entries to device and gateway together"""
+    batches = []
+    monkeypatch.setattr(monitor, "get_if_hwaddr", lambda iface: "02:00:00:00:00:99", raising=False)
+    monkeypatch.setattr(controller, "get_default_interface", lambda: "eth0")
+    monkeypatch.setattr(controller, "_get_gateway_info", lambda: ("10.0.0.1", "02:00:00:00:00:01"))
+    monkeypatch.setattr(controller, "_send_frames", batches.append)
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], time.monotonic())
+    
+    assert controller.stop_cut("10.0.0.2")
+    assert batches == [[
+        controller._arp_frame("10.0.0.2", "AA:BB:CC:00:00:01", "10.0.0.1", "02:00:00:00:00:01"),
+        controller._arp_frame("10.0.0.1", "02:00:00:00:00:01", "10.0.0.2", "AA:BB:CC:00:00:01"),
+    ]]
+
+def test_protection_pins_local_arp_entry(controller, monkeypatch):
+    """Test that protecting a device pins this host's entry for it until unprotected"""
+    calls = []
+    controller.platform_monitor = SimpleNamespace(
+        pin_neighbor=lambda ip, mac: calls.append(("pin", ip, mac)),
+        unpin_neighbor=lambda ip: calls.append(("unpin", ip)),
+    )
+    monkeypatch.setattr(controller, "_start_protection", lambda ip, mac: True)
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], time.monotonic())
+    
+    assert controller.protect_device("10.0.0.2")
+    assert controller.unprotect_device("10.0.0.2")
+    assert calls == [("pin", "10.0.0.2", "AA:BB:CC:00:00:01"), ("unpin", "10.0.0.2")]
+
+def test_protect_device_fails_without_gateway(controller, monkeypatch):
+    """Test that a device isn't marked protected or pinned when protection can't start"""
+    calls = []
+    controller.platform_monitor = SimpleNamespace(pin_neighbor=lambda ip, mac: calls.append(("pin", ip, mac)))
+    monkeypatch.setattr(controller, "_get_gateway_info", lambda: (None, None))
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], time.monotonic())
+    
+    assert not controller.protect_device("10.0.0.2")
+    assert not controller.devices["10.0.0.2"].is_protected
+    assert controller.protected_devices == set()
+    assert controller._arp_jobs == {}
+    assert calls == []
+
+def test_l2socket_is_reused_and_closed_on_interface_change(controller, monkeypatch):
+    """Test that frames share one layer 2 socket until the interface cache is invalidated"""
+    opened = []
+    
+    class FakeSocket:
+        def __init__(self, iface):
+            self.sent, self.closed = [], False
+            opened.append(self)
+        def send(self, frame):
+            self.sent.append(frame)
+        def close(self):
+            self.closed = True
+    
+    monkeypatch.setattr(controller, "_open_l2socket", lambda: FakeSocket(controller.get_default_interface()))
+    monkeypatch.setattr(controller, "_query_default_interface", lambda: "eth0")
+    
+    controller._send_frames([b"a", b"b"])
+    controller._send_frames([b"c"])
+    assert len(opened) == 1 and opened[0].sent == [b"a", b"b", b"c"]
+    
+    controller.invalidate_interface_cache()
+    assert opened[0].closed
+    controller._send_frames([b"d"])
+    assert len(opened) == 2
+
+def test_send_frames_spaces_out_a_burst(controller, monkeypatch):
+    """Test that ARP_FRAME_GAP pauses between the frames of one burst only"""
+    sent, pauses = [], []
+    monkeypatch.setattr(monitor, "ARP_FRAME_GAP", 0.005)
+    monkeypatch.setattr(monitor.time, "sleep", pauses.append)
+    monkeypatch.setattr(controller, "_open_l2socket", lambda: SimpleNamespace(send=sent.append, close=lambda: None))
+    
+    controller._send_frames([b"a", b"b", b"c"])
+    assert sent == [b"a", b"b", b"c"]
+    assert pauses == [0.005, 0.005]
+
+def test_removing_last_arp_job_stops_scheduler_immediately(controller, monkeypatch):
+    """Test that the scheduler thread doesn't sit out its refresh interval after the last job is removed"""
+    monkeypatch.setattr(controller, "_send_frames", lambda frames: None)
+    controller._add_arp_job(("protect", "10.0.0.2"), [b"frame"])
+    scheduler = controller._arp_scheduler
+    time.sleep(0.05)
+    
+    controller._remove_arp_job(("protect", "10.0.0.2"))
+    scheduler.join(timeout=0.5)
+    assert not scheduler.is_alive()
+    assert controller._arp_scheduler is None
+
+def test_default_route_is_forgotten_when_addresses_change(controller, monkeypatch):
+    """Test that an interface refresh showing new addresses drops the memoized default interface"""
+    results = iter([
+        [{"name": "wlan0", "ip": "192.168.1.5"}],
+        [{"name": "wlan0", "ip": "192.168.1.5"}],
+        [{"name": "eth0", "ip": "10.0.0.5"}],
+    ])
+    monkeypatch.setattr(controller, "_query_interfaces", lambda: next(results))
+    monkeypatch.setattr(monitor, "INTERFACE_CACHE_TTL", 0)
+    controller.get_interfaces()
+    controller._default_iface = "wlan0"
+    
+    controller.get_interfaces()
+    assert controller._default_iface == "wlan0"
+    controller.get_interfaces()
+    assert controller._default_iface is None
+
+def test_gateway_info_is_cached_until_invalidated(controller, monkeypatch):
+    """Test that the gateway is looked up once per TTL and again after invalidation"""
+    lookups = []
+    monkeypatch.setattr(controller, "_query_gateway_info",
+                        lambda: lookups.append(1) or ("10.0.0.1", "02:00:00:00:00:01"))
+    assert controller._get_gateway_info() == ("10.0.0.1", "02:00:00:00:00:01")
+    controller._get_gateway_info()
+    assert len(lookups) == 1
+    
+    controller.invalidate_interface_cache()
+    controller._get_gateway_info()
+    assert len(lookups) == 2
+
+def test_gateway_info_on_macos_reads_one_numeric_route(controller, monkeypatch):
+    """Test that the macOS gateway lookup pads arp's short MACs and also yields the default interface"""
+    commands = []
+    outputs = {
+        "route": "   route to: default\ndestination: default\n    gateway: 192.0.2.1\n  interface: en0\n",
+        "arp": "? (192.0.2.1) at 2:fc:0:0:0:5 on en0 ifscope [ethernet]\n",
+    }
+    monkeypatch.setattr(monitor.subprocess, "check_output", lambda cmd, **kwargs: commands.append(cmd) or outputs[cmd[0]])
+    controller.os_type = "Darwin"
+    controller.platform_monitor = None
+    
+    assert controller._get_gateway_info() == ("192.0.2.1", "02:FC:00:00:00:05")
+    assert controller.get_default_interface() == "en0"
+    assert commands == [["route", "-n", "get", "default"], ["arp", "-n", "192.0.2.1"]]
+
+def test_arp_table_fallback_reads_proc_on_linux(controller, monkeypatch, tmp_path):
+    """Test that the Linux ARP table fallback reads the kernel table instead of running arp"""
+    arp = tmp_path / "arp"
+    arp.write_text(
+        "IP address       HW type     Flags       HW address            Mask     Device\n"
+        "192.0.2.1        0x1         0x2         02:fc:00:00:00:05     *        eth0\n"
+        "192.0.2.9        0x1         0x0         00:00:00:00:00:00     *        eth0\n"
+    )
+    read_table = monitor._iter_linux_arp_table
+    monkeypatch.setattr(monitor, "_iter_linux_arp_table", lambda: read_table(str(arp)))
+    monkeypatch.setattr(monitor.subprocess, "check_output", lambda *args, **kwargs: pytest.fail("arp was run"))
+    controller.os_type = "Linux"
+    
+    devices = controller._get_devices_from_arp_table()
+    assert [(device.ip, device.mac) for device in devices] == [("192.0.2.1", "02:FC:00:00:00:05")]
+
+def test_arp_table_fallback_keeps_local_subnet(controller, monkeypatch):
+    """Test that ARP table entries of other interfaces' subnets are not registered"""
+    monkeypatch.setattr(monitor, "_iter_linux_arp_table", lambda: iter([
+        ("192.168.4.20", "02:FC:00:00:00:05"),
+        ("172.17.0.2", "02:42:AC:11:00:02"),
+    ]))
+    controller.os_type = "Linux"
+    controller._get_scan_network({"name": "eth0", "ip": "192.168.1.10", "network_mask": "255.255.0.0"})
+    
+    devices = controller._get_devices_from_arp_table()
+    assert [device.ip for device in devices] == ["192.168.4.20"]
+
+def test_parse_windows_arp_skips_incomplete_broadcast_and_multicast():
+    """Test that arp -a entries are parsed in one pass, whatever the language of the type column"""
+    output = (
+        "\nInterface: 192.168.1.10 --- 0xb\n"
+        "  Internet Address      Physical Address      Type\n"
+        "  192.168.1.1           aa-bb-cc-dd-ee-01     dynamic\n"
+        "  192.168.1.20          02-fc-00-00-00-05     dynamisch\n"
+        "  192.168.1.30          00-00-00-00-00-00     invalid\n"
+        "  192.168.1.255         ff-ff-ff-ff-ff-ff     static\n"
+        "  224.0.0.22            01-00-5e-00-00-16     static\n"
+    )
+    assert monitor._parse_windows_arp(output) == [
+        ("192.168.1.1", "AA:BB:CC:DD:EE:01"),
+        ("192.168.1.20", "02:FC:00:00:00:05"),
+    ]
+
+def test_arp_table_fallback_uses_platform_table_on_windows(controller, monkeypatch):
+    """Test that the Windows ARP table fallback reads the platform table instead of running arp"""
+    controller.os_type = "Windows"
+    controller.platform_monitor = SimpleNamespace(get_arp_table=lambda: [
+        {"ip": "192.0.2.1", "mac": "02:fc:00:00:00:05", "interface": None},
+    ])
+    monkeypatch.setattr(monitor.subprocess, "check_output", lambda *args, **kwargs: pytest.fail("arp was run"))
+    
+    devices = controller._get_devices_from_arp_table()
+    assert [(device.ip, device.mac) for device in devices] == [("192.0.2.1", "02:FC:00:00:00:05")]
+
+def test_block_devices_uses_platform_batch(controller):
+    """Test that blocking several devices is a single platform call"""
+    calls = []
+    controller.platform_monitor = SimpleNamespace(block_devices=lambda ips: calls.append(ips) or True)
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01"), ("10.0.0.3", "AA:BB:CC:00:00:02")],
+                                 time.monotonic())
+    
+    assert controller.block_devices(["10.0.0.2", "10.0.0.3"])
+    assert calls == [["10.0.0.2", "10.0.0.3"]]
+    assert all(device.is_blocked for device in controller.devices.values())
+    assert not controller.block_devices(["10.0.0.2", "10.0.0.3; reboot"])
+
+def test_get_network_summary_counts_active_devices(controller):
+    """Test that totals, active counts and type breakdown come from one snapshot"""
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01"), ("10.0.0.3", "AA:BB:CC:00:00:02")],
+                                 time.monotonic())
+    controller.devices["10.0.0.3"].status = "inactive"
+    summary = controller.get_network_summary()
+    assert summary["total_devices"] == 2
+    assert summary["active_devices"] == 1
+    assert summary["device_types"] == {controller.devices["10.0.0.2"].device_type: 1}
+
+def test_get_network_summary_recounts_only_after_changes(controller, monkeypatch):
+    """Test that polling the summary reuses the counts until devices or types change"""
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], time.monotonic())
+    counts = []
+    count_devices = controller._count_devices
+    monkeypatch.setattr(controller, "_count_devices", lambda: counts.append(1) or count_devices())
+    
+    controller.get_network_summary()
+    controller.get_network_summary()
+    assert len(counts) == 1
+    
+    controller.set_device_type("10.0.0.2", "Gaming")
+    assert controller.get_network_summary()["device_types"] == {"Gaming": 1}
+    assert len(counts) == 2
+
+def test_get_network_summary_survives_unchanged_scans(controller, monkeypatch):
+    """Test that a scan that changes nothing keeps the summary counts, and one that does recounts"""
+    controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], 100.0)
+    counts = []
+    count_devices = controller._count_devices
+    monkeypatch.setattr(controller, "_count_devices", lambda: counts.append(1) or count_devices())
+    controller.get_network_summary()
+    
+    discovered = controller._register_devices([("10.0.0.2", "AA:BB:CC:00:00:01")], 101.0)
+    controller._expire_devices(discovered, 101.0)
+    controller.get_network_summary()
+    assert len(counts) == 1
+    
+    controller._register_devices([("10.0.0.3", "AA:BB:CC:00:00:02")], 102.0)
+    assert controller.get_network_summary()["total_devices"] == 2
+    assert len(counts) == 2